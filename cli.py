@@ -0,0 +1,207 @@
+import argparse
+import sys
+from pathlib import Path
+from typing import List, Optional
+
+from src.model.lexical_analyzer import LexicalAnalyzer
+from src.model.sintatical_analyzer import SintaticalAnalyzer
+
+"""
+Ponto de entrada em linha de comando (sem interface gráfica): não importa PyQt5 nem as views,
+podendo ser usado em CI e em máquinas sem servidor gráfico.
+Para cada arquivo de entrada, executa a análise léxica e, se informada uma gramática, a análise sintática SLR,
+salvando <entrada>_tokens.txt e <entrada>_parsing.csv no diretório de saída.
+
+Códigos de saída:
+    0 - todas as entradas foram aceitas
+    1 - erro ao ler ou processar os arquivos de definições, gramática ou entrada
+    2 - argumentos inválidos (argparse)
+    3 - erro léxico em alguma entrada
+    4 - erro sintático em alguma entrada
+Com várias entradas, prevalece o erro de leitura (1) e, em seguida, o maior código entre as entradas.
+"""
+EXIT_OK = 0
+EXIT_INVALID_FILE = 1
+EXIT_LEXICAL_ERROR = 3
+EXIT_SINTATICAL_ERROR = 4
+
+
+def build_argument_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        description="Lexterminator em linha de comando: análise léxica e sintática SLR sem interface gráfica."
+    )
+    parser.add_argument("inputs", nargs="+", type=Path, help="arquivos de entrada a serem analisados")
+    parser.add_argument("-d", "--definitions", required=True, type=Path, help="arquivo de definições regulares")
+    parser.add_argument("-g", "--grammar", type=Path, help="arquivo da gramática SLR (omitido: apenas análise léxica)")
+    parser.add_argument("-o", "--output-dir", type=Path, default=Path("."), help="diretório dos arquivos de saída")
+    parser.add_argument(
+        "--ignore-whitespaces", action="store_true",
+        help="separa as palavras por espaços, e não apenas por linha"
+    )
+    parser.add_argument(
+        "--maximal-munch", action="store_true",
+        help="percorre o texto bruto com a semântica de maior casamento"
+    )
+    parser.add_argument(
+        "--stream", action="store_true",
+        help="análise em fluxo, com memória limitada: tokens e etapas são gravados à medida que são gerados"
+    )
+    parser.add_argument(
+        "--memory-map", action="store_true",
+        help="mapeia os arquivos de entrada em memória e executa o AFD diretamente sobre seus bytes"
+    )
+    parser.add_argument(
+        "--workers", type=int, default=None,
+        help="divide a análise léxica de cada entrada entre essa quantidade de processos (0: um por CPU)"
+    )
+    parser.add_argument(
+        "--compile-workers", type=int, default=None,
+        help="divide a compilação das definições regulares entre essa quantidade de processos (0: um por CPU)"
+    )
+    parser.add_argument(
+        "--word-cache", type=int, default=None,
+        help="memoiza o reconhecimento de até essa quantidade de palavras distintas"
+    )
+    parser.add_argument(
+        "--lazy-states", type=int, default=None,
+        help="usa o AFD preguiçoso com cache limitado a essa quantidade de estados"
+    )
+    return parser
+
+
+def analyze_input(
+    input_path: Path,
+    output_dir: Path,
+    lexical_analyzer: LexicalAnalyzer,
+    sintatical_analyzer: Optional[SintaticalAnalyzer],
+    ignore_whitespaces: bool,
+    maximal_munch: bool,
+    memory_map: bool,
+    workers: Optional[int]
+) -> int:
+    """
+    Analisa um arquivo de entrada, salvando os tokens e a tabela de etapas da análise sintática.
+    Retorna o código de saída correspondente ao resultado.
+    """
+    lexical_analyzer.output_path = output_dir / f"{input_path.stem}_tokens.txt"
+    lexical_analyzer.read_words_from_file_and_verify_pertinence(
+        input_path, ignore_whitespaces, maximal_munch, memory_map, workers
+    )
+
+    if lexical_analyzer.lexical_error:
+        tokens = lexical_analyzer.tokens
+        errors = [tokens.lexeme(index) for index in range(len(tokens)) if tokens.token(index) == LexicalAnalyzer.LEXICAL_ERROR_TOKEN]
+        print(f"{input_path}: erro léxico em {len(errors)} lexema(s): {' '.join(errors)}", file=sys.stderr)
+        return EXIT_LEXICAL_ERROR
+
+    if sintatical_analyzer is None:
+        print(f"{input_path}: {len(lexical_analyzer.tokens)} tokens reconhecidos")
+        return EXIT_OK
+
+    parsing_path = output_dir / f"{input_path.stem}_parsing.csv"
+    _, passed = sintatical_analyzer.parse_token_stream(lexical_analyzer.token_stream(), parsing_path)
+    if not passed:
+        print(f"{input_path}: erro sintático (ver {parsing_path})", file=sys.stderr)
+        return EXIT_SINTATICAL_ERROR
+
+    print(f"{input_path}: {len(lexical_analyzer.tokens)} tokens reconhecidos, entrada aceita")
+    return EXIT_OK
+
+
+def analyze_input_stream(
+    input_path: Path,
+    output_dir: Path,
+    lexical_analyzer: LexicalAnalyzer,
+    sintatical_analyzer: Optional[SintaticalAnalyzer],
+    ignore_whitespaces: bool,
+    maximal_munch: bool
+) -> int:
+    """
+    Analisa um arquivo de entrada em fluxo: o analisador sintático consome os tokens à medida que são gerados,
+    e ambas as saídas são gravadas incrementalmente. Retorna o código de saída correspondente ao resultado.
+    """
+    tokens_path = output_dir / f"{input_path.stem}_tokens.txt"
+    records = lexical_analyzer.stream_tokens(input_path, ignore_whitespaces, maximal_munch, tokens_path)
+
+    passed = True
+    parsing_path = output_dir / f"{input_path.stem}_parsing.csv"
+    if sintatical_analyzer is not None:
+        passed = sintatical_analyzer.parse_stream((token for token, _, _ in records), parsing_path)
+    # Consome os tokens restantes, para que a lista de tokens fique completa
+    for _ in records:
+        pass
+
+    if lexical_analyzer.lexical_error:
+        print(f"{input_path}: erro léxico (ver {tokens_path})", file=sys.stderr)
+        return EXIT_LEXICAL_ERROR
+    if not passed:
+        print(f"{input_path}: erro sintático (ver {parsing_path})", file=sys.stderr)
+        return EXIT_SINTATICAL_ERROR
+
+    print(f"{input_path}: entrada aceita")
+    return EXIT_OK
+
+
+def main(argv: List[str] = None) -> int:
+    argument_parser = build_argument_parser()
+    args = argument_parser.parse_args(argv)
+    if args.stream and (args.memory_map or args.workers is not None):
+        argument_parser.error("--stream não pode ser usado com --memory-map ou --workers")
+
+    try:
+        args.output_dir.mkdir(parents=True, exist_ok=True)
+        lexical_analyzer = LexicalAnalyzer(args.definitions, args.lazy_states, args.word_cache, args.compile_workers)
+        sintatical_analyzer = None
+        if args.grammar is not None:
+            sintatical_analyzer = SintaticalAnalyzer(args.grammar, set(lexical_analyzer.regular_definitions.tokens))
+    except (OSError, ValueError) as e:
+        print(f"erro: {e}", file=sys.stderr)
+        return EXIT_INVALID_FILE
+
+    exit_code = EXIT_OK
+    for input_path in args.inputs:
+        try:
+            if args.stream:
+                result = analyze_input_stream(
+                    input_path,
+                    args.output_dir,
+                    lexical_analyzer,
+                    sintatical_analyzer,
+                    args.ignore_whitespaces,
+                    args.maximal_munch
+                )
+            else:
+                result = analyze_input(
+                    input_path,
+                    args.output_dir,
+                    lexical_analyzer,
+                    sintatical_analyzer,
+                    args.ignore_whitespaces,
+                    args.maximal_munch,
+                    args.memory_map,
+                    args.workers
+                )
+        except (OSError, ValueError) as e:
+            print(f"{input_path}: erro: {e}", file=sys.stderr)
+            result = EXIT_INVALID_FILE
+        if exit_code != EXIT_INVALID_FILE and (result == EXIT_INVALID_FILE or result > exit_code):
+            exit_code = result
+
+    regular_definitions = lexical_analyzer.regular_definitions
+    if regular_definitions.compiled_automata is not None:
+        print(
+            f"minimização do AFD: {regular_definitions.determinized_states_count} -> "
+            f"{regular_definitions.minimized_states_count} estados",
+            file=sys.stderr
+        )
+    word_cache = lexical_analyzer.word_cache
+    if word_cache is not None:
+        print(
+            f"cache de palavras: {word_cache.hits} acertos, {word_cache.misses} falhas ({word_cache.hit_rate:.1%})",
+            file=sys.stderr
+        )
+    return exit_code
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -27,20 +27,25 @@ class LexicalAndSintaticalAnalyzerController:
         else:
             self.view.show()
 
-    # carrega o arquivo de definições regulares e cria o analisador léxico
+    # carrega o arquivo de definições regulares, cria o analisador léxico e gera o arquivo e o diagrama do autômato
     def set_regular_definitions_file(self, path: str):
         self.__lexical_analyzer = LexicalAnalyzer(path)
+        regular_definitions = self.__lexical_analyzer.regular_definitions
+        regular_definitions.generate_automata_artifacts()
+        print(f"minimização do AFD: {regular_definitions.determinized_states_count} -> {regular_definitions.minimized_states_count} estados")
     
-    # carrega o arquivo da gramátila e cria o analisador sintático
+    # carrega o arquivo da gramátila, cria o analisador sintático e gera o diagrama de itens canônicos
     def set_grammar_file(self, path: str = ""):
         self.__sintatical_analyzer = SintaticalAnalyzer(path, set(self.lexical_analyzer.regular_definitions.tokens))
+        self.__sintatical_analyzer.generate_canonical_items_diagram()
     
     # carrega o arquivo de entrada para ser reconhecido pelo AL e atualiza a view de acordo
-    def set_input_file(self, path: str, ignore_whitespaces = False):
+    def set_input_file(self, path: str, ignore_whitespaces = False, maximal_munch = False):
         self.__last_ignore_whitespaces = ignore_whitespaces
+        self.__last_maximal_munch = maximal_munch
         self.__last_filepath = path
         try:
-            self.lexical_analyzer.read_words_from_file_and_verify_pertinence(path, ignore_whitespaces)
+            self.lexical_analyzer.read_words_from_file_and_verify_pertinence(path, ignore_whitespaces, maximal_munch)
             self.set_token_view()
             self.view.update_handle_run_sintatical()
             self.view.setup_tokens_table_view()
@@ -50,8 +55,8 @@ class LexicalAndSintaticalAnalyzerController:
 
     def select_input_file(self):
         """
-        Abre um QFileDialog com um checkbox adicional ("Ignore whitespaces from file")
-        e envia o caminho + a opção marcada para o controller.
+        Abre um QFileDialog com checkboxes adicionais ("Ignore whitespaces from file" e
+        "Scan raw source text (longest match)") e envia o caminho + as opções marcadas para o controller.
         """
         # Cria o QFileDialog como instância
         dialog = QFileDialog(self.view)
@@ -62,25 +67,29 @@ class LexicalAndSintaticalAnalyzerController:
         # Cria e adiciona o checkbox personalizado
         checkbox = QCheckBox("Ignore whitespaces from file")
         checkbox.setChecked(True)
+        munch_checkbox = QCheckBox("Scan raw source text (longest match)")
+        munch_checkbox.setChecked(False)
 
         # Espaçamento visual e adição ao layout do diálogo
         layout = dialog.layout()
         layout.addWidget(QLabel(" "), layout.rowCount(), 0, 1, layout.columnCount())
         layout.addWidget(checkbox, layout.rowCount(), 0, 1, layout.columnCount())
+        layout.addWidget(munch_checkbox, layout.rowCount(), 0, 1, layout.columnCount())
 
         # Executa o diálogo
         if dialog.exec_():
             file_path = dialog.selectedFiles()[0]
             ignore_whitespaces = checkbox.isChecked()
-            self.set_input_file(file_path, ignore_whitespaces)
+            maximal_munch = munch_checkbox.isChecked()
+            self.set_input_file(file_path, ignore_whitespaces, maximal_munch)
     
     # executa novamente a análise léxica com o mesmo arquivo aberto
     def rerun_lexical(self):
-        self.set_input_file(self.__last_filepath, self.__last_ignore_whitespaces)
+        self.set_input_file(self.__last_filepath, self.__last_ignore_whitespaces, self.__last_maximal_munch)
 
     # executa a análise sintática e atualiza a view de acordo
     def run_sintatical_analysis(self):
-        parsing_table, passed = self.sintatical_analyzer.read_tokens_from_lexical_analyzer_output(self.lexical_analyzer.output_path) # Faz a leitura da lista de tokens gerada pelo analisador léxico
+        parsing_table, passed = self.sintatical_analyzer.parse_token_stream(self.lexical_analyzer.token_stream()) # Consome os tokens gerados pelo analisador léxico
         self.view.setup_parsing_table_view(parsing_table)
         if passed:
             self.show_success("Sintatical Analysis finished", "Sintatical analysis completed successfully. No errors were found.")
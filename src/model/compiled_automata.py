@@ -0,0 +1,265 @@
+from array import array
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple, Union
+
+from src.utils.maximal_munch import scan_maximal_munch
+
+
+class CompiledAutomata:
+    """
+    Classe que representa a forma compilada de um AFD, construída uma única vez após a determinização.
+    Os estados são numerados com inteiros (o estado inicial é sempre 0), cada símbolo do alfabeto é
+    mapeado para uma coluna, e as transições ficam em um vetor plano indexado por estado * colunas + coluna.
+    """
+
+    # Valor usado no vetor de transições para indicar ausência de transição (estado morto)
+    DEAD_STATE = -1
+
+    # Bytes considerados espaços em branco pelo scanner sobre bytes (espaços ASCII, como em bytes.split)
+    WHITESPACE_BYTES = frozenset(b" \t\n\r\x0b\x0c")
+
+    def __init__(
+        self,
+        symbol_to_column: Dict[Union[str, int], int],
+        transitions: array,
+        accept_tokens: List[Optional[str]],
+        initial_state: int = 0
+    ):
+        self.symbol_to_column: Dict[Union[str, int], int] = symbol_to_column
+        self.transitions: array = transitions
+        self.accept_tokens: List[Optional[str]] = accept_tokens  # token aceito por estado, ou None se não final
+        self.initial_state: int = initial_state
+        self.columns_count: int = len(set(symbol_to_column.values()))
+        self.states_count: int = len(accept_tokens)
+        self.__utf8_automata: CompiledAutomata = None
+        self.__batch_tables: tuple = None
+
+    def next_state(self, state: int, symbol: str) -> int:
+        """
+        Retorna o estado alcançado a partir de um estado lendo um símbolo,
+        ou DEAD_STATE caso não exista transição.
+        """
+        column = self.symbol_to_column.get(symbol)
+        if column is None:
+            return self.DEAD_STATE
+        return self.transitions[state * self.columns_count + column]
+
+    def run(self, input_str: str) -> Tuple[bool, str]:
+        """
+        Executa o autômato compilado sobre a string de entrada.
+        Retorna uma tupla:
+        (True, nome_do_token) se a entrada for aceita,
+        (False, "") se a entrada for rejeitada.
+        """
+        symbol_to_column = self.symbol_to_column
+        transitions = self.transitions
+        columns_count = self.columns_count
+        state = self.initial_state
+
+        for symbol in input_str:
+            column = symbol_to_column.get(symbol)
+            if column is None:
+                return (False, "")
+            state = transitions[state * columns_count + column]
+            if state < 0:
+                return (False, "")
+
+        token = self.accept_tokens[state]
+        if token is None:
+            return (False, "")
+        return (True, token)
+
+    def run_batch(self, words: Sequence[str]) -> List[Tuple[bool, str]]:
+        """
+        Executa o autômato sobre várias palavras de uma vez, retornando os resultados de run na mesma ordem.
+        Com NumPy disponível, as palavras são agrupadas por tamanho em matrizes de code points, e todas as palavras
+        de um grupo avançam um caractere por passo por indexação vetorizada de uma matriz de transições densa,
+        tirando o laço por caractere do interpretador. Sem NumPy, equivale a executar run em cada palavra.
+        """
+        try:
+            import numpy
+        except ImportError:
+            return [self.run(word) for word in words]
+
+        dead_state, char_columns, transitions, accept_ids, tokens = self._batch_tables(numpy)
+        lengths = numpy.fromiter(map(len, words), dtype=numpy.int64, count=len(words))
+        final_states = numpy.empty(len(words), dtype=numpy.int32)
+
+        order = numpy.argsort(lengths, kind="stable")
+        group_lengths, group_starts = numpy.unique(lengths[order], return_index=True)
+        group_ends = list(group_starts[1:]) + [len(words)]
+        for length, start, end in zip(group_lengths.tolist(), group_starts.tolist(), group_ends):
+            indexes = order[start:end]
+            states = numpy.full(len(indexes), self.initial_state, dtype=numpy.int32)
+            if length > 0:
+                encoded = "".join([words[index] for index in indexes.tolist()]).encode("utf-32-le")
+                codes = numpy.frombuffer(encoded, dtype=numpy.uint32).reshape(len(indexes), length)
+                columns = char_columns[numpy.minimum(codes, len(char_columns) - 1)]
+                for step in range(length):
+                    states = transitions[states, columns[:, step]]
+            final_states[indexes] = states
+
+        return [(True, tokens[token_id]) if token_id >= 0 else (False, "") for token_id in accept_ids[final_states].tolist()]
+
+    def _batch_tables(self, numpy) -> tuple:
+        """
+        Constrói (uma única vez) as tabelas densas usadas por run_batch: a coluna de cada code point até o maior
+        do alfabeto (com uma coluna extra, morta, para os demais caracteres), a matriz de transições com um
+        estado morto absorvente no lugar de DEAD_STATE, e o índice do token aceito por estado (-1 se não final).
+        """
+        if self.__batch_tables is None:
+            dead_state = self.states_count
+            unknown_column = self.columns_count
+            max_code = max((ord(symbol) for symbol in self.symbol_to_column), default=0)
+
+            char_columns = numpy.full(max_code + 2, unknown_column, dtype=numpy.int32)
+            for symbol, column in self.symbol_to_column.items():
+                char_columns[ord(symbol)] = column
+
+            transitions = numpy.full((self.states_count + 1, self.columns_count + 1), dead_state, dtype=numpy.int32)
+            flat = numpy.array(self.transitions, dtype=numpy.int32).reshape(self.states_count, self.columns_count)
+            transitions[:self.states_count, :self.columns_count] = numpy.where(flat < 0, dead_state, flat)
+
+            tokens = sorted({token for token in self.accept_tokens if token is not None})
+            token_ids = {token: index for index, token in enumerate(tokens)}
+            accept_ids = numpy.array(
+                [token_ids[token] if token is not None else -1 for token in self.accept_tokens] + [-1],
+                dtype=numpy.int32
+            )
+            self.__batch_tables = (dead_state, char_columns, transitions, accept_ids, tokens)
+        return self.__batch_tables
+
+    def __getstate__(self):
+        # As tabelas de run_batch são derivadas (e dependem do NumPy): não são serializadas
+        state = self.__dict__.copy()
+        state["_CompiledAutomata__batch_tables"] = None
+        return state
+
+    def scan(
+        self,
+        text: str,
+        start: int = 0,
+        end: Optional[int] = None,
+        final: bool = True
+    ) -> Iterator[Tuple[int, int, Optional[str]]]:
+        """
+        Percorre o texto bruto com a semântica de maior casamento (maximal munch),
+        gerando tuplas (início, fim, token) para cada lexema reconhecido.
+        Guarda o último estado de aceitação visto, de modo que o token retornado é o do maior prefixo aceito,
+        já resolvido pela prioridade registrada na determinização.
+        Espaços em branco que não iniciam nenhum token são ignorados entre lexemas.
+        Em caso de erro, gera (início, fim, None) agrupando os caracteres não reconhecidos até o próximo
+        espaço em branco ou caractere que possa iniciar um token, e continua a análise a partir dali.
+        Com final=False (texto recebido em partes), a análise para, sem gerar o registro, no primeiro lexema
+        ou erro que alcance o fim do trecho sem estar concluído: ele deve ser analisado novamente a partir do seu
+        início quando houver mais texto. O laço é o de utils/maximal_munch, compartilhado com scan_bytes e LazyAutomata.
+        """
+        transitions = self.transitions
+        columns_count = self.columns_count
+        return scan_maximal_munch(
+            text, start, end, final,
+            self.initial_state,
+            self.DEAD_STATE,
+            self.symbol_to_column.get,
+            lambda state, column: transitions[state * columns_count + column],
+            self.accept_tokens.__getitem__,
+            str.isspace
+        )
+
+    def utf8_automata(self) -> "CompiledAutomata":
+        """
+        Retorna o AFD equivalente sobre os bytes da codificação UTF-8 da entrada (construído no primeiro uso),
+        cujo alfabeto são valores de bytes (0 a 255). Permite executar o autômato diretamente sobre
+        bytes, memoryviews ou arquivos mapeados em memória, sem decodificar o texto.
+        """
+        if self.__utf8_automata is None:
+            self.__utf8_automata = self._build_utf8_automata()
+        return self.__utf8_automata
+
+    def _build_utf8_automata(self) -> "CompiledAutomata":
+        """
+        Substitui cada transição por um caractere de n bytes em UTF-8 por uma cadeia de n transições por byte,
+        com estados intermediários (não finais) compartilhados entre caracteres de mesmo prefixo a partir do mesmo estado.
+        """
+        byte_transitions: List[Dict[int, int]] = [dict() for _ in range(self.states_count)]
+        accept_tokens = list(self.accept_tokens)
+        prefix_states: Dict[Tuple[int, bytes], int] = dict()
+
+        for state in range(self.states_count):
+            row = state * self.columns_count
+            for symbol, column in self.symbol_to_column.items():
+                target = self.transitions[row + column]
+                if target < 0:
+                    continue
+                encoded = symbol.encode("utf-8")
+                current = state
+                for length in range(1, len(encoded)):
+                    intermediate = prefix_states.get((state, encoded[:length]))
+                    if intermediate is None:
+                        intermediate = len(byte_transitions)
+                        prefix_states[(state, encoded[:length])] = intermediate
+                        byte_transitions.append(dict())
+                        accept_tokens.append(None)
+                        byte_transitions[current][encoded[length - 1]] = intermediate
+                    current = intermediate
+                byte_transitions[current][encoded[-1]] = target
+
+        # Bytes com colunas de transição idênticas compartilham a mesma coluna
+        column_of_signature: Dict[Tuple[int, ...], int] = dict()
+        symbol_to_column: Dict[int, int] = dict()
+        for byte in sorted({byte for transitions in byte_transitions for byte in transitions}):
+            signature = tuple(transitions.get(byte, self.DEAD_STATE) for transitions in byte_transitions)
+            symbol_to_column[byte] = column_of_signature.setdefault(signature, len(column_of_signature))
+
+        columns = sorted(column_of_signature.items(), key=lambda item: item[1])
+        transitions = array("i", [self.DEAD_STATE]) * (len(byte_transitions) * len(columns))
+        for signature, column in columns:
+            for state, target in enumerate(signature):
+                transitions[state * len(columns) + column] = target
+
+        return CompiledAutomata(symbol_to_column, transitions, accept_tokens, self.initial_state)
+
+    def scan_bytes(
+        self,
+        data,
+        start: int = 0,
+        end: Optional[int] = None,
+        final: bool = True
+    ) -> Iterator[Tuple[int, int, Optional[str]]]:
+        """
+        Equivalente a scan para o AFD sobre bytes (ver utf8_automata): percorre bytes, memoryviews ou mmaps
+        sem cópia, gerando (início, fim, token) com posições em bytes.
+        Apenas espaços em branco ASCII são ignorados entre lexemas, e final tem o mesmo significado que em scan.
+        """
+        transitions = self.transitions
+        columns_count = self.columns_count
+        end = len(data) if end is None else end
+        return scan_maximal_munch(
+            data, start, end, final,
+            self.initial_state,
+            self.DEAD_STATE,
+            self.symbol_to_column.get,
+            lambda state, column: transitions[state * columns_count + column],
+            self.accept_tokens.__getitem__,
+            self.WHITESPACE_BYTES.__contains__,
+            lambda position: self._has_initial_transition(data, position, end)
+        )
+
+    def _has_initial_transition(self, data, position: int, end: int) -> bool:
+        """
+        Indica se o caractere UTF-8 iniciado na posição possui transição a partir do estado inicial
+        (bytes de continuação nunca iniciam um caractere). Equivale ao ponto de ressincronização de scan.
+        """
+        lead = data[position]
+        length = 1 if lead < 0x80 else 2 if lead < 0xE0 else 3 if lead < 0xF0 else 4
+        if length > end - position:
+            return False
+
+        state = self.initial_state
+        for index in range(position, position + length):
+            column = self.symbol_to_column.get(data[index])
+            if column is None:
+                return False
+            state = self.transitions[state * self.columns_count + column]
+            if state < 0:
+                return False
+        return True
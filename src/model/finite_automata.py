@@ -1,46 +1,86 @@
 from src.utils.paths import AUTOMATA_DIAGRAM_DIR
+from src.model.compiled_automata import CompiledAutomata
+from src.model.nfa_bitset_index import NFABitsetIndex
+from src.utils.character_classes import class_label, expand_intervals, label_intervals, partition_intervals
 
+from array import array
 from collections import deque, defaultdict
 from typing import List, Set, Dict, Tuple
 from pprint import pprint
 
-from prettytable import PrettyTable
-from graphviz import Digraph
-
 
 class FiniteAutomata:
     """
     Classe que representa o Autômato Finito, de acordo com a definição formal.
     Inclui métodos de operações com o autômato como união e determinização.
+    Os estados são identificados por inteiros (densos, a partir de 0, nos autômatos construídos pelas operações);
+    os nomes exibidos na tabela de transições, no arquivo e no diagrama são gerados apenas quando necessários
+    (ver display_names).
     """
     def __init__(
         self,
-        states: Set[str],
+        states: Set[int],
         alphabet: Set[str],
-        initial_state: str,
-        final_states: Set[str],
-        transitions: Dict[Tuple[str, str], Set[str]]
+        initial_state: int,
+        final_states: Set[int],
+        transitions: Dict[Tuple[int, str], Set[int]]
     ):
-        self.states: Set[str] = states
+        self.states: Set[int] = states
         self.alphabet: Set[str] = alphabet
-        self.initial_state: str = initial_state
-        self.final_states: Set[str] = final_states
-        self.transitions: Dict[Tuple[str, str], Set[str]] = transitions
-        self.final_state_to_token: Dict[str, str] = {}  # Mapeia estados finais para nomes de tokens
-
-    def get_transitions(self, state: str, symbol: str) -> Set[str]:
+        self.initial_state: int = initial_state
+        self.final_states: Set[int] = final_states
+        self.transitions: Dict[Tuple[int, str], Set[int]] = transitions
+        self.final_state_to_token: Dict[int, str] = {}  # Mapeia estados finais para nomes de tokens
+        self.__char_to_symbol: Dict[str, str] = None  # Mapeia cada caractere para a classe do alfabeto que o contém
+        self.__display_names: Dict[int, str] = None  # Mapeia cada estado para o seu nome de exibição
+
+    def get_transitions(self, state: int, symbol: str) -> Set[int]:
         """
         Retorna o conjunto de estados alcançáveis a partir de um estado dado,
         lendo um determinado símbolo.
         """
         return self.transitions.get((state, symbol), set())
 
+    def symbol_of(self, char: str) -> str | None:
+        """
+        Retorna o símbolo do alfabeto (caractere ou classe de caracteres, como [0-9]) que contém o caractere dado,
+        ou None caso o caractere não pertença ao alfabeto.
+        """
+        if self.__char_to_symbol is None:
+            self.__char_to_symbol = {
+                char: symbol
+                for symbol in self.alphabet
+                for char in expand_intervals(label_intervals(symbol))
+            }
+        return self.__char_to_symbol.get(char)
+
+    @property
+    def display_names(self) -> Dict[int, str]:
+        """
+        Nomes de exibição dos estados, construídos no primeiro acesso: estados finais recebem o nome do token
+        associado (token, token_2, ...) e os demais recebem nomes como q0, q1, ...
+        """
+        if self.__display_names is None:
+            token_counts = defaultdict(int)
+            display_names: Dict[int, str] = {}
+            for state in sorted(self.final_states):
+                token = self.final_state_to_token.get(state)
+                if token:
+                    token_counts[token] += 1
+                    display_names[state] = token if token_counts[token] == 1 else f"{token}_{token_counts[token]}"
+
+            unnamed_states = sorted(self.states - display_names.keys())
+            display_names.update({state: f"q{index}" for index, state in enumerate(unnamed_states)})
+            self.__display_names = display_names
+        return self.__display_names
+
     def transition_table(self):
         """
         Imprime a tabela de transições do autômato utilizando prettytable,
-        com nomes de estados encurtados (q0, q1, ...) e tokens nos estados finais.
+        com os nomes de exibição dos estados (ver display_names).
+        O prettytable é importado apenas aqui, já que a tabela só é usada pela interface.
         """
-        from collections import defaultdict
+        from prettytable import PrettyTable
 
         all_symbols = self.alphabet.copy()
         if any(sym == '&' for (_, sym) in self.transitions):
@@ -50,50 +90,17 @@ class FiniteAutomata:
         table = PrettyTable()
         table.field_names = headers
 
-        # Cria mapeamento: nome longo do estado → q0, q1, ...
-        state_names = sorted(self.states)
-        base_name_map = {state: f"q{i}" for i, state in enumerate(state_names)}
-
-        # Gerar nomes descritivos para estados finais com base nos tokens
-        token_counts = defaultdict(int)
-        final_name_map = {}
-
-        for state in self.final_states:
-            token = self.final_state_to_token.get(state, None)
-            if token:
-                token_counts[token] += 1
-                if token_counts[token] == 1:
-                    final_name_map[state] = token
-                else:
-                    final_name_map[state] = f"{token}_{token_counts[token]}"
-            else:
-                final_name_map[state] = base_name_map[state]  # fallback
-
-        for state in state_names:
+        display_names = self.display_names
+        for state in sorted(self.states):
             # Define marcador e nome do estado
-            if state in self.final_states:
-                name = final_name_map[state]
-                marker = '*'
-            else:
-                name = base_name_map[state]
-                marker = ''
-
+            marker = '*' if state in self.final_states else ''
             if state == self.initial_state:
                 marker = '→' + marker
 
-            display_state = f"{marker}{name}"
-            row = [display_state]
-
+            row = [f"{marker}{display_names[state]}"]
             for symbol in sorted(all_symbols):
                 dests = self.get_transitions(state, symbol)
-                if dests:
-                    dest_str = ','.join(
-                        final_name_map[d] if d in self.final_states else base_name_map[d]
-                        for d in sorted(dests)
-                    )
-                else:
-                    dest_str = '-'
-                row.append(dest_str)
+                row.append(','.join(display_names[d] for d in sorted(dests)) if dests else '-')
 
             table.add_row(row)
 
@@ -102,19 +109,15 @@ class FiniteAutomata:
 
     def to_file(self, file_path: str):
         """
-        Salva o autômato em um arquivo, usando nomes encurtados para estados:
+        Salva o autômato em um arquivo, usando os nomes de exibição dos estados:
         - estados finais recebem nomes descritivos com base no token associado
         - demais estados recebem nomes como q0, q1, ...
         """
-
-        # Nome curto base: q0, q1, ...
-        ordered_states = sorted(self.states)
-
         final_map = self._rename_states()
 
         with open(file_path, 'w', encoding='utf-8') as f:
             # Número de estados
-            f.write(f"{len(ordered_states)}\n")
+            f.write(f"{len(self.states)}\n")
 
             # Estado inicial
             f.write(f"{final_map[self.initial_state]}\n")
@@ -131,7 +134,7 @@ class FiniteAutomata:
                 for dest in sorted(destinations):
                     f.write(f"{final_map[origin]},{symbol},{final_map[dest]}\n")
 
-    def _epsilon_closure(self, states: Set[str]) -> Set[str]:
+    def _epsilon_closure(self, states: Set[int]) -> Set[int]:
         """
         Retorna o ε-fecho do conjunto de estados fornecido.
         """
@@ -156,8 +159,9 @@ class FiniteAutomata:
         """
         current_states = self._epsilon_closure({self.initial_state})
 
-        for symbol in input_str:
-            next_states: Set[str] = set()
+        for char in input_str:
+            symbol = self.symbol_of(char)
+            next_states: Set[int] = set()
             for state in current_states:
                 for target in self.get_transitions(state, symbol):
                     next_states.update(self._epsilon_closure({target}))
@@ -179,88 +183,48 @@ class FiniteAutomata:
         """
         Determiniza o autômato (AFND → AFD) e retorna um novo objeto AF.
         Preserva o mapeamento de estados finais para tokens.
+        A construção de subconjuntos usa o NFABitsetIndex: conjuntos de estados são máscaras de bits,
+        o ε-fecho de cada estado é calculado uma única vez, e apenas os símbolos que de fato ocorrem são visitados.
         """
-        def _name_from_set(state_set: Set[str]) -> str:
-            return '_'.join(sorted(state_set))
-
-        # Mapeia conjuntos de estados do AFND → nome do novo estado determinístico
-        state_map: Dict[frozenset, str] = {}
+        index = NFABitsetIndex(self, token_priority)
 
         # Elementos para o novo AFD
-        transitions: Dict[Tuple[str, str], Set[str]] = {}
-        new_states: Set[str] = set()
-        new_final_states: Set[str] = set()
-        new_alphabet: Set[str] = self.alphabet.copy()
-        
-        # Dicionário para mapear novos estados finais para tokens
-        new_final_state_to_token: Dict[str, str] = {}
-
-        # Cálculo do ε-fecho do estado inicial do AFND
-        initial_closure = self._epsilon_closure({self.initial_state})
-        initial_fset = frozenset(initial_closure)
-        initial_name = _name_from_set(initial_closure)
+        transitions: Dict[Tuple[int, str], Set[int]] = {}
+        new_final_states: Set[int] = set()
+        new_final_state_to_token: Dict[int, str] = {}
 
-        # Mapeamos o ε-fecho como o primeiro estado determinístico
-        state_map[initial_fset] = initial_name
-        queue = deque([initial_fset]) # fila de estados compostos a serem processados
+        # Mapeamos o ε-fecho do estado inicial como o primeiro estado determinístico (0);
+        # os demais conjuntos são numerados na ordem em que são descobertos
+        initial_mask = index.initial_mask
+        state_map: Dict[int, int] = {initial_mask: 0}
+        queue = deque([initial_mask])  # fila de estados compostos a serem processados
 
-        # Processa todos os estados compostos (conjuntos de estados do AFND)
         while queue:
-            current_set = queue.popleft()
-            current_name = state_map[current_set]
-            new_states.add(current_name)
-
-            # Verifica se algum estado no conjunto atual é final no AFND original
-            final_states_in_set = current_set & self.final_states
-            if final_states_in_set:
-                new_final_states.add(current_name)
-                
-                # Determina qual token corresponde a este estado final
-                # Prioriza o token mais antigo (definido primeiro no arquivo de definições regulares)
-                best_token = None
-                best_priority = float('inf')  # Menor índice na lista = maior prioridade
-
-                for state in final_states_in_set:
-                    token = self.final_state_to_token.get(state)
-                    if token and token in token_priority:
-                        priority = token_priority.index(token)
-                        if priority < best_priority:
-                            best_priority = priority
-                            best_token = token
-
-                if best_token:
-                    new_final_state_to_token[current_name] = best_token
-            
-            # Para cada símbolo do alfabeto, calcula os estados alcançáveis
-            for symbol in self.alphabet:
-                next_set = set()
-
-                # Para cada estado no conjunto atual, pega transições com o símbolo
-                for state in current_set:
-                    targets = self.get_transitions(state, symbol)
-                    # Aplica ε-fecho em cada destino
-                    for t in targets:
-                        next_set.update(self._epsilon_closure({t}))
-
-                if not next_set:
-                    continue # nenhuma transição válida com esse símbolo
-
-                next_fset = frozenset(next_set)
-
-                # Se o conjunto resultante ainda não tem nome, cria um e coloca na fila
-                if next_fset not in state_map:
-                    next_name = _name_from_set(next_set)
-                    state_map[next_fset] = next_name
-                    queue.append(next_fset)
-
-                # Adiciona a transição ao novo autômato
-                transitions[(current_name, symbol)] = {state_map[next_fset]}
+            current_mask = queue.popleft()
+            current_state = state_map[current_mask]
+
+            # Verifica se algum estado no conjunto atual é final no AFND original,
+            # escolhendo o token de maior prioridade
+            if index.is_final(current_mask):
+                new_final_states.add(current_state)
+                token = index.accept_token(current_mask)
+                if token is not None:
+                    new_final_state_to_token[current_state] = token
+
+            # Calcula os destinos apenas para os símbolos que saem de algum estado do conjunto
+            for symbol, next_mask in index.next_masks(current_mask).items():
+                # Se o conjunto resultante ainda não tem identificador, cria um e coloca na fila
+                if next_mask not in state_map:
+                    state_map[next_mask] = len(state_map)
+                    queue.append(next_mask)
+
+                transitions[(current_state, symbol)] = {state_map[next_mask]}
 
         # Cria o novo autômato determinizado
         determinized = FiniteAutomata(
             states=set(state_map.values()),
-            alphabet=new_alphabet,
-            initial_state=initial_name,
+            alphabet=self.alphabet.copy(),
+            initial_state=0,
             final_states=new_final_states,
             transitions=transitions
         )
@@ -269,10 +233,186 @@ class FiniteAutomata:
 
         return determinized
 
+    def minimize(self) -> 'FiniteAutomata':
+        """
+        Minimiza o AFD pelo refinamento de partições de Hopcroft e retorna um novo objeto AF.
+        Estados inalcançáveis e estados mortos (que não alcançam estado final) são removidos antes do refinamento.
+        A partição inicial separa os estados não finais e, entre os finais, um bloco por token,
+        de modo que estados que aceitam tokens distintos nunca são unificados.
+        """
+        # Estados alcançáveis a partir do estado inicial
+        reachable = {self.initial_state}
+        queue = deque([self.initial_state])
+        reverse: Dict[int, Set[int]] = defaultdict(set)
+        while queue:
+            state = queue.popleft()
+            for symbol in self.alphabet:
+                for dest in self.get_transitions(state, symbol):
+                    reverse[dest].add(state)
+                    if dest not in reachable:
+                        reachable.add(dest)
+                        queue.append(dest)
+
+        # Estados vivos: alcançáveis que alcançam algum estado final
+        live = reachable & self.final_states
+        queue = deque(live)
+        while queue:
+            state = queue.popleft()
+            for origin in reverse[state]:
+                if origin not in live:
+                    live.add(origin)
+                    queue.append(origin)
+
+        states = sorted(live | {self.initial_state})
+        state_ids = {state: index for index, state in enumerate(states)}
+        dead = len(states)  # estado morto implícito, completa a função de transição
+        symbols = sorted(self.alphabet)
+
+        # Transições inversas por símbolo: inverse[símbolo][destino] = origens
+        inverse: List[Dict[int, List[int]]] = [defaultdict(list) for _ in symbols]
+        for column, symbol in enumerate(symbols):
+            for state in states:
+                dest = next(iter(self.get_transitions(state, symbol)), None)
+                target = state_ids.get(dest, dead)
+                inverse[column][target].append(state_ids[state])
+            inverse[column][dead].append(dead)
+
+        # Partição inicial: não finais (incluindo o estado morto) e finais agrupados por token
+        initial_blocks: Dict[str, Set[int]] = defaultdict(set)
+        for state in states:
+            key = f"final:{self.final_state_to_token.get(state, '')}" if state in self.final_states else "non_final"
+            initial_blocks[key].add(state_ids[state])
+        initial_blocks["non_final"].add(dead)
+
+        blocks: List[Set[int]] = [block for block in initial_blocks.values() if block]
+        block_of: Dict[int, int] = {state: index for index, block in enumerate(blocks) for state in block}
+        worklist = set(range(len(blocks)))
+
+        while worklist:
+            splitter = set(blocks[worklist.pop()])
+            for column in range(len(symbols)):
+                predecessors = set()
+                for target in splitter:
+                    predecessors.update(inverse[column].get(target, ()))
+                if not predecessors:
+                    continue
+
+                touched: Dict[int, Set[int]] = defaultdict(set)
+                for state in predecessors:
+                    touched[block_of[state]].add(state)
+
+                for block_index, intersection in touched.items():
+                    block = blocks[block_index]
+                    if len(intersection) == len(block):
+                        continue
+                    difference = block - intersection
+                    blocks[block_index] = intersection
+                    blocks.append(difference)
+                    new_index = len(blocks) - 1
+                    for state in difference:
+                        block_of[state] = new_index
+
+                    if block_index in worklist:
+                        worklist.add(new_index)
+                    elif len(intersection) <= len(difference):
+                        worklist.add(block_index)
+                    else:
+                        worklist.add(new_index)
+
+        # Constrói o novo autômato, numerando os blocos na ordem do menor estado original contido em cada um
+        dead_block = block_of[dead]
+        live_blocks = sorted((index for index in range(len(blocks)) if index != dead_block), key=lambda index: min(blocks[index]))
+        block_ids = {index: block_id for block_id, index in enumerate(live_blocks)}
+
+        transitions: Dict[Tuple[int, str], Set[int]] = {}
+        final_states: Set[int] = set()
+        final_state_to_token: Dict[int, str] = {}
+        for index, block_id in block_ids.items():
+            representative = states[min(blocks[index])]
+            for symbol in symbols:
+                dest = next(iter(self.get_transitions(representative, symbol)), None)
+                if dest in state_ids and block_of[state_ids[dest]] != dead_block:
+                    transitions[(block_id, symbol)] = {block_ids[block_of[state_ids[dest]]]}
+            if representative in self.final_states:
+                final_states.add(block_id)
+                if representative in self.final_state_to_token:
+                    final_state_to_token[block_id] = self.final_state_to_token[representative]
+
+        # Se a linguagem é vazia, o estado inicial é equivalente ao estado morto e é mantido isolado
+        initial_block = block_of[state_ids[self.initial_state]]
+        initial_state = block_ids.get(initial_block, len(block_ids))
+
+        minimized = FiniteAutomata(
+            states=set(block_ids.values()) | {initial_state},
+            alphabet=self.alphabet.copy(),
+            initial_state=initial_state,
+            final_states=final_states,
+            transitions=transitions
+        )
+        minimized.final_state_to_token = final_state_to_token
+
+        return minimized
+
+    def compile(self) -> CompiledAutomata:
+        """
+        Compila o AFD para a forma baseada em vetores (CompiledAutomata), com estados inteiros,
+        mapa de caractere para coluna, vetor plano de transições e token aceito por estado.
+        Os estados são numerados em ordem de busca em largura a partir do estado inicial, e símbolos do alfabeto
+        com transições idênticas em todos os estados compartilham a mesma coluna.
+        """
+        for (_, symbol), destinations in self.transitions.items():
+            if symbol == '&' or len(destinations) > 1:
+                raise ValueError("Apenas autômatos determinísticos podem ser compilados")
+
+        symbols = sorted(self.alphabet)
+
+        state_ids: Dict[int, int] = {self.initial_state: 0}
+        ordered_states = [self.initial_state]
+        queue = deque([self.initial_state])
+        while queue:
+            state = queue.popleft()
+            for symbol in symbols:
+                for dest in self.get_transitions(state, symbol):
+                    if dest not in state_ids:
+                        state_ids[dest] = len(ordered_states)
+                        ordered_states.append(dest)
+                        queue.append(dest)
+
+        # Agrupa os símbolos cujas colunas de transição são idênticas (classes de equivalência do alfabeto)
+        columns: Dict[Tuple[int, ...], int] = {}
+        symbol_to_column: Dict[str, int] = {}
+        for symbol in symbols:
+            column_targets = tuple(
+                state_ids[next(iter(self.transitions[(state, symbol)]))] if (state, symbol) in self.transitions
+                else CompiledAutomata.DEAD_STATE
+                for state in ordered_states
+            )
+            column = columns.setdefault(column_targets, len(columns))
+            for char in expand_intervals(label_intervals(symbol)):
+                symbol_to_column[char] = column
+
+        columns_count = len(columns)
+        transitions = array('i', [CompiledAutomata.DEAD_STATE]) * (len(ordered_states) * columns_count)
+        for column_targets, column in columns.items():
+            for state_id, target in enumerate(column_targets):
+                transitions[state_id * columns_count + column] = target
+
+        accept_tokens: List[str | None] = []
+        for state in ordered_states:
+            if state in self.final_states:
+                accept_tokens.append(self.final_state_to_token.get(state, ""))
+            else:
+                accept_tokens.append(None)
+
+        return CompiledAutomata(symbol_to_column, transitions, accept_tokens)
+
     def _generate_finite_automata_diagram(self):
         """
         Gera o diagrama para o autômato, e salva no diretório padrão.
+        O graphviz é importado apenas aqui, já que o diagrama só é usado pela interface.
         """
+        from graphviz import Digraph
+
         final_map = self._rename_states()
         transitions = defaultdict(list)
     
@@ -290,7 +430,7 @@ class FiniteAutomata:
         for (origin, dest), symbols_list in sorted(transitions.items()):
             symbols = str()
             for symbol in symbols_list:
-                add_symbol = "\\\\" if symbol == "\\" else symbol
+                add_symbol = symbol.replace("\\", "\\\\")
                 symbols += f"{add_symbol}|"
             symbols = list(symbols)
             symbols.pop()
@@ -303,61 +443,41 @@ class FiniteAutomata:
 
         diagram.render(filename="automata_diagram", format="png", directory=str(AUTOMATA_DIAGRAM_DIR))
     
-    def _rename_states(self) -> dict:
+    def _rename_states(self) -> Dict[int, str]:
         """
-        Renomeia os estados do autômato por simplicidade.
+        Retorna os nomes de exibição dos estados (ver display_names), com a barra invertida escapada
+        para o arquivo e o diagrama.
         """
-        from collections import defaultdict
-
-        # Nome descritivo para estados finais com base em tokens
-        token_counts = defaultdict(int)
-        final_name_map = {}
-        for state in self.final_states:
-            token = self.final_state_to_token.get(state)
-            if token:
-                token_counts[token] += 1
-                if token_counts[token] == 1:
-                    final_name_map[state] = token
-                else:
-                    final_name_map[state] = f"{token}_{token_counts[token]}"
-
-        # Nome curto base: q0, q1, ...
-        ordered_states = sorted(self.states - self.final_states)
-        base_name_map = {state: f"q{i}" for i, state in enumerate(ordered_states)}
-
-        # Mapa final: estado original → nome final (token ou qN)
-        final_map = {
-            state: ("\\\\" if final_name_map[state] == "\\" else final_name_map[state]) if state in self.final_states else base_name_map[state]
-            for state in self.states
+        return {
+            state: "\\\\" if name == "\\" else name
+            for state, name in self.display_names.items()
         }
 
-        return final_map
-
     @staticmethod
     def from_file(file_path: str) -> 'FiniteAutomata':
         """
         Lê um autômato no formato do trabalho e retorna um objeto AF.
+        Os nomes dos estados no arquivo são numerados na ordem em que aparecem, a partir do estado inicial (0).
         """
         with open(file_path, 'r', encoding='utf-8') as f:
             lines = [line.strip() for line in f if line.strip()]
 
-        initial_state = lines[1]
-        final_states = set(lines[2].split(','))
+        state_ids: Dict[str, int] = {lines[1]: 0}
+        initial_state = 0
+        final_states = {state_ids.setdefault(name, len(state_ids)) for name in lines[2].split(',')}
         alphabet = set(lines[3].split(','))
 
-        transitions: Dict[Tuple[str, str], Set[str]] = {}
-        states: Set[str] = set()
+        transitions: Dict[Tuple[int, str], Set[int]] = {}
 
         for line in lines[4:]:
             origin, symbol, dest = line.split(',')
-            key = (origin, symbol)
+            key = (state_ids.setdefault(origin, len(state_ids)), symbol)
             if key not in transitions:
                 transitions[key] = set()
-            transitions[key].add(dest)
-            states.update([origin, dest])
+            transitions[key].add(state_ids.setdefault(dest, len(state_ids)))
 
         return FiniteAutomata(
-            states=states,
+            states=set(state_ids.values()),
             alphabet=alphabet,
             initial_state=initial_state,
             final_states=final_states,
@@ -368,43 +488,48 @@ class FiniteAutomata:
     def union(af1: 'FiniteAutomata', af2: 'FiniteAutomata') -> 'FiniteAutomata':
         """
         Retorna um novo autômato que é a união dos autômatos af1 e af2,
-        renomeando os estados de af2 somente se houver conflito com os estados de af1.
-        Cria um novo estado inicial com transições epsilon para os estados iniciais de af1 e af2.
+        deslocando os identificadores dos estados de af2 para depois dos estados de af1.
+        Cria um novo estado inicial, o último identificador, com transições epsilon para os estados iniciais de af1 e af2.
         """
-        new_initial = 'qi'
+        offset = max(af1.states, default=-1) + 1
+        new_initial = offset + max(af2.states, default=-1) + 1
 
         # Estados já usados no af1
         states_af1 = af1.states
 
-        # Mapa de renomeação dos estados do af2 (somente renomeia se conflito)
-        rename_map = {}
+        # Mapa de renomeação dos estados do af2
+        rename_map = {s: s + offset for s in af2.states}
 
-        for s in af2.states:
-            if s in states_af1:
-                rename_map[s] = 'af2-' + s
-            else:
-                rename_map[s] = s
-
-        # Renomear elementos de af2 para evitar conflitos de nomes iguais
+        # Renomear elementos de af2 para evitar conflitos de identificadores iguais
         af2_renamed_states = set(rename_map.values())
 
+        # Refina os alfabetos dos dois autômatos para uma partição comum de classes de caracteres
+        labels = sorted(af1.alphabet | af2.alphabet)
+        partition, membership = partition_intervals([label_intervals(label) for label in labels])
+        partition_labels = [class_label(intervals) for intervals in partition]
+        refined_symbols = {'&': ['&']}
+        for label, classes in zip(labels, membership):
+            refined_symbols[label] = [partition_labels[index] for index in classes]
+
         af2_renamed_transitions = {}
         for (origin, symbol), dests in af2.transitions.items():
             new_origin = rename_map[origin]
             new_dests = {rename_map[d] for d in dests}
-            af2_renamed_transitions.setdefault((new_origin, symbol), set()).update(new_dests)
+            for new_symbol in refined_symbols[symbol]:
+                af2_renamed_transitions.setdefault((new_origin, new_symbol), set()).update(new_dests)
 
         af2_renamed_finals = {rename_map[s] for s in af2.final_states}
         af2_renamed_initial = rename_map[af2.initial_state]
         new_states = states_af1 | af2_renamed_states | {new_initial}
-        new_alphabet = af1.alphabet | af2.alphabet
+        new_alphabet = set(partition_labels)
 
         # Unir transições
         new_transitions = {}
 
         # Copiar transições do af1
         for (origin, symbol), dests in af1.transitions.items():
-            new_transitions.setdefault((origin, symbol), set()).update(dests)
+            for new_symbol in refined_symbols[symbol]:
+                new_transitions.setdefault((origin, new_symbol), set()).update(dests)
 
         # Copiar transições renomeadas do af2
         for (origin, symbol), dests in af2_renamed_transitions.items():
@@ -436,6 +561,3 @@ class FiniteAutomata:
                 new_automata.final_state_to_token[renamed_state] = token
 
         return new_automata
-
-
-
@@ -0,0 +1,124 @@
+from src.model.finite_automata import FiniteAutomata
+from src.model.nfa_bitset_index import NFABitsetIndex
+from src.utils.maximal_munch import scan_maximal_munch
+
+from collections import OrderedDict
+from typing import Dict, Iterator, List, Optional, Tuple
+
+
+class LazyAutomata:
+    """
+    Classe que representa a determinização preguiçosa (lazy) do AFND da união das definições regulares.
+    Os estados do AFD são criados sob demanda durante a execução, como conjuntos de estados do AFND (máscaras de bits),
+    e mantidos em um cache de tamanho limitado com política LRU. Cada estado em cache guarda as transições
+    já calculadas e o token aceito, de modo que entradas que percorrem uma parte pequena do autômato executam
+    praticamente na velocidade de um AFD, sem que o AFD completo precise existir.
+    """
+
+    # Conjunto vazio de estados do AFND, equivalente ao estado morto
+    DEAD_STATE = 0
+
+    def __init__(self, automata: FiniteAutomata, token_priority: List[str], max_states: int = 1024):
+        if max_states < 1:
+            raise ValueError("O cache de estados do autômato preguiçoso deve comportar ao menos um estado")
+        self.__automata: FiniteAutomata = automata
+        self.__index: NFABitsetIndex = NFABitsetIndex(automata, token_priority)
+        self.__states: OrderedDict[int, Tuple[Dict[str, int], Optional[str]]] = OrderedDict()
+        self.max_states: int = max_states
+        self.initial_state: int = self.__index.initial_mask
+        self.hits: int = 0
+        self.misses: int = 0
+        self.evictions: int = 0
+
+    def _cached_state(self, state: int) -> Tuple[Dict[str, int], Optional[str]]:
+        """
+        Retorna a entrada do cache (transições calculadas, token aceito) de um estado,
+        criando-a caso não exista e removendo o estado usado há mais tempo quando o limite é atingido.
+        """
+        entry = self.__states.get(state)
+        if entry is not None:
+            self.__states.move_to_end(state)
+            return entry
+
+        entry = (dict(), self.__index.accept_token(state))
+        self.__states[state] = entry
+        if len(self.__states) > self.max_states:
+            self.__states.popitem(last=False)
+            self.evictions += 1
+        return entry
+
+    def next_state(self, state: int, char: str) -> int:
+        """
+        Retorna o estado alcançado a partir de um estado lendo um caractere,
+        ou DEAD_STATE caso não exista transição. Calcula a transição apenas na primeira vez.
+        """
+        transitions, _ = self._cached_state(state)
+        next_state = transitions.get(char)
+        if next_state is not None:
+            self.hits += 1
+            return next_state
+
+        self.misses += 1
+        symbol = self.__automata.symbol_of(char)
+        next_state = self.DEAD_STATE if symbol is None else self.__index.next_mask(state, symbol)
+        transitions[char] = next_state
+        return next_state
+
+    def accept_token(self, state: int) -> Optional[str]:
+        """
+        Retorna o token aceito por um estado, ou None caso o estado não seja final.
+        """
+        return self._cached_state(state)[1]
+
+    def run(self, input_str: str) -> Tuple[bool, str]:
+        """
+        Executa o autômato sobre a string de entrada.
+        Retorna uma tupla:
+        (True, nome_do_token) se a entrada for aceita,
+        (False, "") se a entrada for rejeitada.
+        """
+        state = self.initial_state
+        for char in input_str:
+            state = self.next_state(state, char)
+            if state == self.DEAD_STATE:
+                return (False, "")
+
+        if not self.__index.is_final(state):
+            return (False, "")
+        token = self.accept_token(state)
+        return (True, token if token is not None else "")
+
+    def scan(
+        self,
+        text: str,
+        start: int = 0,
+        end: Optional[int] = None,
+        final: bool = True
+    ) -> Iterator[Tuple[int, int, Optional[str]]]:
+        """
+        Percorre o texto bruto com a semântica de maior casamento (maximal munch),
+        gerando tuplas (início, fim, token) para cada lexema reconhecido, ou (início, fim, None) em caso de erro,
+        com a mesma recuperação de erros e o mesmo significado de final de CompiledAutomata.scan.
+        """
+        return scan_maximal_munch(
+            text, start, end, final,
+            self.initial_state,
+            self.DEAD_STATE,
+            lambda char: char,
+            self.next_state,
+            self.accept_token,
+            str.isspace
+        )
+
+    def clear(self):
+        """
+        Esvazia o cache de estados e zera os contadores.
+        """
+        self.__states.clear()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @property
+    def cached_states_count(self):
+        return len(self.__states)
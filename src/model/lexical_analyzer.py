@@ -1,86 +1,412 @@
 from src.model.regular_definitions import RegularDefinitions
+from src.model.compiled_automata import CompiledAutomata
+from src.model.lazy_automata import LazyAutomata
+from src.model.token_stream import TokenStream
+from src.model.word_cache import WordCache
+from src.utils.parallel_lexing import lex_file_in_parallel
+from src.utils.scanner_generator import write_scanner_module
 from src.utils.paths import LEXICAL_ANALYZER_OUTPUT_DIR, REGULAR_DEFINITIONS_INPUT_DIR
 
+from array import array
 from pathlib import Path
-from typing import List
+from typing import Iterable, Iterator, List, Optional, Tuple
+import mmap
+import os
+import re
 
 
 class LexicalAnalyzer:
     """
     Classe que representa o Analisador Léxico considerando as definições regulares de entrada.
     Utilizando as estruturas internas, gera o autômato finito determinístico para o AL.
+    Com lazy_states_limit, o AFD é construído sob demanda durante a análise (ver LazyAutomata).
+    Com word_cache_size, o reconhecimento de palavras inteiras é memoizado (ver WordCache).
+    Com compile_workers, as definições regulares são compiladas por um conjunto de processos (ver RegularDefinitions).
+    Com use_cache = False, o cache em disco do analisador compilado não é lido nem escrito (ver RegularDefinitions).
+    A tabela de transições (PrettyTable) é construída apenas no primeiro acesso a table.
+    O resultado da análise é um TokenStream (ver tokens e token_stream), com ids de tokens e posições dos lexemas
+    em source; words e words_result são derivados dele quando acessados.
+    O arquivo de saída é opcional (output_path = None desativa sua escrita).
     """
 
-    def __init__(self, regular_definitions_path: str):
-        self.__words: List[str] = list()
-        self.__regular_definitions = RegularDefinitions(regular_definitions_path)
-        self.__table = self.__regular_definitions.automata.transition_table()
-        self.__words_result = None
+    # Token atribuído aos lexemas não reconhecidos
+    LEXICAL_ERROR_TOKEN = "erro!"
+
+    # Tamanho dos blocos lidos (e do buffer de escrita) na análise em fluxo
+    STREAM_CHUNK_SIZE = 1 << 16
+
+    # Quantidade de palavras reconhecidas por chamada de CompiledAutomata.run_batch, limitando a memória das matrizes
+    BATCH_SIZE = 1 << 16
+
+    def __init__(
+        self,
+        regular_definitions_path: str,
+        lazy_states_limit: int = None,
+        word_cache_size: int = None,
+        compile_workers: int = None,
+        use_cache: bool = True
+    ):
+        self.__regular_definitions = RegularDefinitions(
+            regular_definitions_path,
+            use_cache=use_cache,
+            lazy_states_limit=lazy_states_limit,
+            compile_workers=compile_workers
+        )
+        self.__word_cache: WordCache = WordCache(word_cache_size) if word_cache_size is not None else None
+        self.__table = None
+        self.__source: str = str()
+        self.__word_starts: array = array("Q")
+        self.__word_ends: array = array("Q")
+        self.__tokens: TokenStream = None
         self.__lexical_error = False
-        self.__output_path: Path = LEXICAL_ANALYZER_OUTPUT_DIR / "tokens_output.txt"
+        self.__output_path: Optional[Path] = LEXICAL_ANALYZER_OUTPUT_DIR / "tokens_output.txt"
     
-    def read_words_from_file_and_verify_pertinence(self, file_path: Path, ignore_whitespaces = False):
+    def read_words_from_file_and_verify_pertinence(
+        self,
+        file_path: Path,
+        ignore_whitespaces = False,
+        maximal_munch = False,
+        memory_map = False,
+        workers: int = None
+    ):
         """
-        Lê arquivo de entrada e salva a lista de tokens reconhecidos em um diretório padrão
+        Lê arquivo de entrada e reconhece seus tokens, salvando a lista de tokens em output_path
+        (diretório padrão), caso definido.
+        Com maximal_munch, o texto bruto é percorrido pelo scanner de maior casamento,
+        sem depender da separação das palavras por espaços ou quebras de linha.
+        Com memory_map, o arquivo é mapeado em memória e o AFD é executado diretamente sobre seus bytes
+        (ver map_file_and_verify_pertinence). Com workers, a análise é dividida entre processos
+        (ver read_file_in_parallel_and_verify_pertinence).
         """
-        self.words = []
+        if workers is not None:
+            self.read_file_in_parallel_and_verify_pertinence(
+                file_path, ignore_whitespaces, maximal_munch, workers, self.output_path
+            )
+            return
+        if memory_map:
+            self.map_file_and_verify_pertinence(file_path, ignore_whitespaces, maximal_munch, self.output_path)
+            return
+
         with open(file_path, "r", encoding="utf-8") as file:
-            if ignore_whitespaces:
-                for line in file:
-                    self.words.extend(str(line).strip().split())
-            else:
-                self.words = [str(word).strip() for word in file]
+            source = file.read()
 
-        
+        if maximal_munch:
+            self.scan_source_and_verify_pertinence(source, self.output_path)
+            return
+
+        self.source = source
+        self.__word_starts, self.__word_ends = self._split_words(source, ignore_whitespaces)
         self.verify_words_pertinence(self.output_path)
+
+    def map_file_and_verify_pertinence(
+        self,
+        file_path: Path,
+        ignore_whitespaces: bool,
+        maximal_munch: bool,
+        output_path: Optional[Path]
+    ):
+        """
+        Mapeia o arquivo de entrada em memória e executa o AFD sobre bytes (ver CompiledAutomata.utf8_automata)
+        diretamente sobre o mapeamento, sem copiar o arquivo para objetos Python: as palavras são lidas
+        por memoryviews, o fluxo de tokens guarda posições em bytes e os lexemas são decodificados sob demanda.
+        Requer o AFD compilado. Apenas espaços em branco ASCII separam palavras e lexemas.
+        """
+        if self.regular_definitions.compiled_automata is None:
+            raise ValueError("A leitura mapeada em memória requer o AFD compilado (modo preguiçoso não suportado).")
+        automata = self.regular_definitions.compiled_automata.utf8_automata()
+
+        with open(file_path, "rb") as file:
+            if os.fstat(file.fileno()).st_size == 0:
+                source = bytes()
+            else:
+                source = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        if maximal_munch:
+            records = automata.scan_bytes(source)
+        else:
+            starts, ends = self._split_words(source, ignore_whitespaces)
+            view = memoryview(source)
+
+            def run_words():
+                for start, end in zip(starts, ends):
+                    accepted, token = automata.run(view[start:end])
+                    yield (start, end, token if accepted else None)
+
+            records = run_words()
+
+        self._store_tokens(source, records, output_path)
+
+    def read_file_in_parallel_and_verify_pertinence(
+        self,
+        file_path: Path,
+        ignore_whitespaces: bool,
+        maximal_munch: bool,
+        workers: int,
+        output_path: Optional[Path]
+    ):
+        """
+        Divide o arquivo mapeado em memória em faixas analisadas por um conjunto de processos (ver utils/parallel_lexing),
+        que recebem o AFD compilado uma única vez, e junta os resultados em ordem, com o mesmo resultado da análise
+        sequencial sobre bytes (map_file_and_verify_pertinence). workers = 0 usa um processo por CPU.
+        """
+        if self.regular_definitions.compiled_automata is None:
+            raise ValueError("A análise paralela requer o AFD compilado (modo preguiçoso não suportado).")
+
+        tokens = lex_file_in_parallel(
+            self.regular_definitions.compiled_automata,
+            file_path,
+            ignore_whitespaces,
+            maximal_munch,
+            self.LEXICAL_ERROR_TOKEN,
+            workers or None
+        )
+        self.lexical_error = tokens.intern(self.LEXICAL_ERROR_TOKEN) in tokens.token_ids
+        self.source = tokens.source
+        self.__word_starts, self.__word_ends = tokens.starts, tokens.ends
+        self.__tokens = tokens
+        if output_path is not None:
+            self.write_words_result_to_file(output_path)
+
+    @staticmethod
+    def _split_words(source: str | bytes, ignore_whitespaces: bool) -> Tuple[array, array]:
+        """
+        Retorna as posições de início e de fim das palavras do texto (ou dos bytes): uma por linha,
+        sem os espaços das extremidades, ou, com ignore_whitespaces, cada sequência separada por espaços em branco.
+        """
+        is_text = isinstance(source, str)
+        starts, ends = array("Q"), array("Q")
+        if ignore_whitespaces:
+            for match in re.finditer(r"\S+" if is_text else rb"\S+", source):
+                starts.append(match.start())
+                ends.append(match.end())
+            return starts, ends
+
+        newline = "\n" if is_text else b"\n"
+        line_start = 0
+        while line_start < len(source):
+            line_end = source.find(newline, line_start)
+            next_line = line_end + 1
+            if line_end == -1:
+                line_end = next_line = len(source)
+            line = source[line_start:line_end]
+            start = line_start + len(line) - len(line.lstrip())
+            starts.append(start)
+            ends.append(max(start, line_start + len(line.rstrip())))
+            line_start = next_line
+        return starts, ends
     
-    def verify_words_pertinence(self, output_path: Path):
+    def _word_runner(self) -> CompiledAutomata | LazyAutomata | WordCache:
         """
-        Itera pelas palavras buscando reconhecê-las com o autômato.
-        Constrói a lista de tokens de acordo com o estado de aceitação
+        Retorna o objeto usado para reconhecer palavras inteiras: o cache de palavras, associado ao autômato atual,
+        caso habilitado (word_cache_size), ou o próprio autômato.
+        """
+        if self.word_cache is None:
+            return self.regular_definitions.runner
+        self.word_cache.bind(self.regular_definitions.runner)
+        return self.word_cache
+
+    def verify_words_pertinence(self, output_path: Optional[Path]):
+        """
+        Itera pelas palavras buscando reconhecê-las com o autômato (compilado ou preguiçoso).
+        Constrói o fluxo de tokens de acordo com o estado de aceitação
         retornado pelo autômato, ou erro.
-        Salva a lista de tokens em um arquivo de saída, com diretório padrão.
+        Com o AFD compilado e sem cache de palavras, as palavras são reconhecidas em lotes de BATCH_SIZE
+        (ver CompiledAutomata.run_batch).
+        Salva a lista de tokens em um arquivo de saída, caso output_path seja informado.
         """
-        regular_definitions_automata = self.regular_definitions.automata
-        output_lines = []
-        results = []
+        regular_definitions_automata = self._word_runner()
+        source = self.source
+        tokens = TokenStream(source)
         self.lexical_error = False
 
-        for word in self.words:
-            accepted, token = regular_definitions_automata.run(word)
-            if accepted:
-                results.append((word, token))
-                output_lines.append(f"<{word},{token}>")
-            else:
+        if isinstance(regular_definitions_automata, CompiledAutomata):
+            results = self._run_words_in_batches(regular_definitions_automata)
+        else:
+            results = (regular_definitions_automata.run(source[start:end]) for start, end in zip(self.__word_starts, self.__word_ends))
+
+        for (accepted, token), start, end in zip(results, self.__word_starts, self.__word_ends):
+            if not accepted:
+                self.lexical_error = True
+                token = self.LEXICAL_ERROR_TOKEN
+            tokens.append(token, start, end)
+
+        # As posições das palavras coincidem com as dos tokens: os vetores passam a ser compartilhados
+        self.__word_starts, self.__word_ends = tokens.starts, tokens.ends
+        self.__tokens = tokens
+        if output_path is not None:
+            self.write_words_result_to_file(output_path)
+
+    def _run_words_in_batches(self, automata: CompiledAutomata) -> Iterator[Tuple[bool, str]]:
+        """
+        Gera o resultado de run para cada palavra, reconhecendo-as em lotes de BATCH_SIZE palavras.
+        """
+        source, starts, ends = self.source, self.__word_starts, self.__word_ends
+        for batch_start in range(0, len(starts), self.BATCH_SIZE):
+            batch_end = batch_start + self.BATCH_SIZE
+            words = [source[start:end] for start, end in zip(starts[batch_start:batch_end], ends[batch_start:batch_end])]
+            yield from automata.run_batch(words)
+
+    def scan_source_and_verify_pertinence(self, source: str, output_path: Optional[Path]):
+        """
+        Percorre o texto bruto com o scanner de maior casamento do autômato (compilado ou preguiçoso),
+        reconhecendo lexemas mesmo quando não separados por espaços (ex: x=y+1;).
+        Todos os erros léxicos do texto são reportados em uma única passada.
+        Salva a lista de tokens em um arquivo de saída, caso output_path seja informado.
+        """
+        self._store_tokens(source, self.regular_definitions.runner.scan(source), output_path)
+
+    def _store_tokens(self, source: str | bytes, records: Iterable[Tuple[int, int, Optional[str]]], output_path: Optional[Path]):
+        """
+        Constrói o fluxo de tokens a partir de registros (início, fim, token), com token None para lexemas
+        não reconhecidos, e o salva em um arquivo de saída, caso output_path seja informado.
+        """
+        tokens = TokenStream(source)
+        self.lexical_error = False
+
+        for start, end, token in records:
+            if token is None:
                 self.lexical_error = True
-                results.append((word, "erro!"))
-                output_lines.append(f"<{word},erro!>")
+                token = self.LEXICAL_ERROR_TOKEN
+            tokens.append(token, start, end)
+
+        self.source = source
+        self.__word_starts, self.__word_ends = tokens.starts, tokens.ends
+        self.__tokens = tokens
+        if output_path is not None:
+            self.write_words_result_to_file(output_path)
 
-        self.words_result = results
+    def stream_tokens(
+        self,
+        file_path: Path,
+        ignore_whitespaces: bool = False,
+        maximal_munch: bool = False,
+        output_path: Optional[Path] = None
+    ) -> Iterator[Tuple[str, int, int]]:
+        """
+        Análise léxica em fluxo, com memória limitada: o arquivo é lido incrementalmente (por linha, ou em blocos
+        de STREAM_CHUNK_SIZE caracteres com maximal_munch) e cada token é gerado assim que reconhecido,
+        como registro (token, início, fim) com posições em caracteres no arquivo.
+        Os tokens são escritos em output_path (caso informado) por um arquivo com buffer, à medida que são gerados.
+        Nenhum resultado é mantido em memória: lexical_error indica se houve erro léxico até o token atual.
+        """
+        self.lexical_error = False
+        sink = open(output_path, "w", encoding="utf-8", buffering=self.STREAM_CHUNK_SIZE) if output_path else None
+        try:
+            with open(file_path, "r", encoding="utf-8") as file:
+                lexemes = self._scan_file(file) if maximal_munch else self._split_file(file, ignore_whitespaces)
+                for lexeme, start, end, token in lexemes:
+                    if token is None:
+                        self.lexical_error = True
+                        token = self.LEXICAL_ERROR_TOKEN
+                    if sink is not None:
+                        sink.write(f"<{lexeme},{token}>\n")
+                    yield (token, start, end)
+        finally:
+            if sink is not None:
+                sink.close()
+
+    def _split_file(self, file, ignore_whitespaces: bool) -> Iterator[Tuple[str, int, int, Optional[str]]]:
+        """
+        Lê o arquivo linha a linha, gerando (lexema, início, fim, token) para cada palavra,
+        com a mesma separação de _split_words.
+        """
+        regular_definitions_automata = self._word_runner()
+        offset = 0
+        for line in file:
+            starts, ends = self._split_words(line.rstrip("\n"), ignore_whitespaces)
+            if not ignore_whitespaces and not starts:
+                starts, ends = [0], [0]  # Linha vazia: palavra vazia, como em _split_words
+            for start, end in zip(starts, ends):
+                word = line[start:end]
+                accepted, token = regular_definitions_automata.run(word)
+                yield (word, offset + start, offset + end, token if accepted else None)
+            offset += len(line)
+
+    def _scan_file(self, file) -> Iterator[Tuple[str, int, int, Optional[str]]]:
+        """
+        Lê o arquivo em blocos e os percorre com o scanner de maior casamento, gerando (lexema, início, fim, token).
+        Todo o texto após o último lexema concluído (inclusive espaços em branco, que podem iniciar um token)
+        é mantido no buffer e analisado novamente com o bloco seguinte; scan ignora os espaços que não casam.
+        """
+        regular_definitions_automata = self.regular_definitions.runner
+        buffer = str()
+        offset = 0
+        while True:
+            chunk = file.read(self.STREAM_CHUNK_SIZE)
+            final = not chunk
+            buffer += chunk
+            position = 0
+            for start, end, token in regular_definitions_automata.scan(buffer, final=final):
+                yield (buffer[start:end], offset + start, offset + end, token)
+                position = end
+            if final:
+                return
+            buffer = buffer[position:]
+            offset += position
 
-        with open(output_path, "w", encoding="utf-8") as out_file:
-            for line in output_lines:
-                out_file.write(line + "\n")
+    def token_stream(self) -> Iterator[Tuple[str, int, int]]:
+        """
+        Itera pelos tokens da última análise como registros (token, início, fim), em que início e fim
+        delimitam o lexema em source. Lexemas não reconhecidos possuem o token LEXICAL_ERROR_TOKEN.
+        Permite que o analisador sintático consuma os tokens diretamente, sem passar pelo arquivo de saída.
+        """
+        if self.tokens is None:
+            raise ValueError("Nenhum resultado encontrado. Execute verify_words_pertinence() antes.")
+        return iter(self.tokens)
         
     def write_words_result_to_file(self, output_path: Path):
         """
-        Escreve os resultados de self.words_result no formato <word,token>
+        Escreve os resultados da última análise no formato <word,token>
         em um arquivo escolhido pelo usuário
         """
-        if self.words_result is None:
+        if self.tokens is None:
             raise ValueError("Nenhum resultado encontrado. Execute verify_words_pertinence() antes.")
 
         with open(output_path, "w", encoding="utf-8") as file:
-            for word, token in self.words_result:
-                file.write(f"<{word},{token}>\n")
+            for lexeme, (token, _, _) in zip(self.tokens.lexemes(), self.tokens):
+                file.write(f"<{lexeme},{token}>\n")
+
+    def generate_scanner_module(self, output_path: Path):
+        """
+        Gera um módulo Python autocontido com o scanner do AFD compilado (ver utils/scanner_generator),
+        que pode ser usado em outros processos sem importar o Lexterminator.
+        """
+        if self.regular_definitions.compiled_automata is None:
+            raise ValueError("O scanner só pode ser gerado a partir do AFD compilado (modo preguiçoso não suportado).")
+        write_scanner_module(self.regular_definitions.compiled_automata, output_path)
 
     @property
-    def words(self):
-        return self.__words
+    def words(self) -> List[str]:
+        source = self.source
+        words = [source[start:end] for start, end in zip(self.__word_starts, self.__word_ends)]
+        return words if isinstance(source, str) else [word.decode("utf-8") for word in words]
 
     @words.setter
     def words(self, words: List[str]):
-        self.__words = words
+        # As palavras passam a ser posições em um texto com uma palavra por linha
+        self.source = "\n".join(words)
+        self.__word_starts, self.__word_ends = array("Q"), array("Q")
+        position = 0
+        for word in words:
+            self.__word_starts.append(position)
+            self.__word_ends.append(position + len(word))
+            position += len(word) + 1
+
+    @property
+    def source(self):
+        return self.__source
+
+    @source.setter
+    def source(self, source: str):
+        self.__source = source
+
+    @property
+    def tokens(self) -> TokenStream:
+        return self.__tokens
+
+    @property
+    def word_cache(self) -> WordCache:
+        return self.__word_cache
 
     @property
     def regular_definitions(self):
@@ -88,22 +414,25 @@ class LexicalAnalyzer:
     
     @property
     def table(self):
+        if self.__table is None:
+            self.__table = self.regular_definitions.automata.transition_table()
         return self.__table
     
     @property
-    def words_result(self):
-        return self.__words_result
-
-    @words_result.setter
-    def words_result(self, words_result: List[str]):
-        self.__words_result = words_result
+    def words_result(self) -> List[Tuple[str, str]]:
+        """
+        Lista de pares (lexema, token) da última análise, criada a partir do fluxo de tokens.
+        """
+        if self.tokens is None:
+            return None
+        return list(zip(self.tokens.lexemes(), (token for token, _, _ in self.tokens)))
 
     @property
     def output_path(self):
         return self.__output_path
 
     @output_path.setter
-    def output_path(self, output_path: Path):
+    def output_path(self, output_path: Optional[Path]):
         self.__output_path = output_path
 
     @property
@@ -0,0 +1,110 @@
+from typing import Dict, Iterator, List, Optional, Tuple
+
+
+def iterate_bits(mask: int) -> Iterator[int]:
+    """
+    Itera pelos índices dos bits ligados de uma máscara inteira, do menor para o maior.
+    """
+    while mask:
+        lowest = mask & -mask
+        yield lowest.bit_length() - 1
+        mask ^= lowest
+
+
+class NFABitsetIndex:
+    """
+    Classe que representa um AFND indexado para a construção de subconjuntos com máscaras de bits.
+    Cada estado do AFND corresponde a um bit (na ordem dos identificadores) e os conjuntos de estados são representados como máscaras.
+    O ε-fecho de cada estado é calculado uma única vez, e as transições são indexadas por estado,
+    já fechadas por ε, de modo que apenas os símbolos que de fato ocorrem são visitados.
+    """
+    def __init__(self, automata, token_priority: List[str]):
+        self.states: List[int] = sorted(automata.states)
+        self.state_ids: Dict[int, int] = {state: index for index, state in enumerate(self.states)}
+
+        # Transições indexadas por estado: símbolo → máscara de destinos
+        epsilon_masks = [0] * len(self.states)
+        outgoing: List[Dict[str, int]] = [dict() for _ in self.states]
+        for (origin, symbol), destinations in automata.transitions.items():
+            mask = 0
+            for dest in destinations:
+                mask |= 1 << self.state_ids[dest]
+            origin_id = self.state_ids[origin]
+            if symbol == '&':
+                epsilon_masks[origin_id] |= mask
+            else:
+                outgoing[origin_id][symbol] = outgoing[origin_id].get(symbol, 0) | mask
+
+        # ε-fecho de cada estado, calculado uma única vez
+        self.closures: List[int] = [0] * len(self.states)
+        for state_id in range(len(self.states)):
+            closure = 1 << state_id
+            stack = [state_id]
+            while stack:
+                pending = epsilon_masks[stack.pop()] & ~closure
+                closure |= pending
+                stack.extend(iterate_bits(pending))
+            self.closures[state_id] = closure
+
+        # Destinos já fechados por ε, por estado e símbolo
+        self.closed_outgoing: List[Dict[str, int]] = [
+            {symbol: self.closure_of(mask) for symbol, mask in symbols.items()}
+            for symbols in outgoing
+        ]
+
+        # Prioridade dos tokens: menor posição na lista = maior prioridade (token definido primeiro)
+        token_rank: Dict[str, int] = {}
+        for index, token in enumerate(token_priority):
+            token_rank.setdefault(token, index)
+
+        self.final_mask: int = 0
+        self.final_rank: Dict[int, Tuple[int, str]] = {}
+        for state in automata.final_states:
+            state_id = self.state_ids[state]
+            self.final_mask |= 1 << state_id
+            token = automata.final_state_to_token.get(state)
+            if token in token_rank:
+                self.final_rank[state_id] = (token_rank[token], token)
+
+        self.initial_mask: int = self.closures[self.state_ids[automata.initial_state]]
+
+    def closure_of(self, mask: int) -> int:
+        """
+        Retorna o ε-fecho de um conjunto de estados.
+        """
+        closure = 0
+        for state_id in iterate_bits(mask):
+            closure |= self.closures[state_id]
+        return closure
+
+    def next_masks(self, mask: int) -> Dict[str, int]:
+        """
+        Retorna, para cada símbolo que sai de algum estado do conjunto, o conjunto de destinos já fechado por ε.
+        """
+        next_masks: Dict[str, int] = {}
+        for state_id in iterate_bits(mask):
+            for symbol, target in self.closed_outgoing[state_id].items():
+                next_masks[symbol] = next_masks.get(symbol, 0) | target
+        return next_masks
+
+    def next_mask(self, mask: int, symbol: str) -> int:
+        """
+        Retorna o conjunto de destinos (fechado por ε) a partir de um conjunto de estados lendo um símbolo.
+        """
+        next_mask = 0
+        for state_id in iterate_bits(mask):
+            next_mask |= self.closed_outgoing[state_id].get(symbol, 0)
+        return next_mask
+
+    def is_final(self, mask: int) -> bool:
+        """
+        Verifica se algum estado do conjunto é final no AFND.
+        """
+        return bool(mask & self.final_mask)
+
+    def accept_token(self, mask: int) -> Optional[str]:
+        """
+        Retorna o token de maior prioridade entre os estados finais do conjunto, ou None se não houver.
+        """
+        ranked = [self.final_rank[state_id] for state_id in iterate_bits(mask & self.final_mask) if state_id in self.final_rank]
+        return min(ranked)[1] if ranked else None
@@ -3,12 +3,12 @@ class Node:
     Classe que representa um nó na árvore utilizada na conversão de ER para AFD.
     """
 
-    def __init__(self, token: str, left_node: "Node" = None, right_node: "Node" = None, value: str = str(), operator: bool = True):
+    def __init__(self, token: str, left_node: "Node" = None, right_node: "Node" = None, value: int = 0, operator: bool = True):
 
         self.__token: str = token
-        self.__value: str = value
-        self.__first_pose: set = set()
-        self.__last_pose: set = set()
+        self.__value: int = value  # posição da folha (0 para operadores)
+        self.__first_pose: int = 0  # conjuntos de posições como máscaras de bits
+        self.__last_pose: int = 0
         self.__nullable: bool = False
         self.__left_node: Node = left_node
         self.__right_node: Node = right_node
@@ -31,7 +31,7 @@ class Node:
         return self.__value
     
     @value.setter
-    def value(self, value: str):
+    def value(self, value: int):
         self.__value = value
 
     @property
@@ -39,7 +39,7 @@ class Node:
         return self.__first_pose
     
     @first_pose.setter
-    def first_pose(self, first_pose: set):
+    def first_pose(self, first_pose: int):
         self.__first_pose = first_pose
     
     @property
@@ -47,7 +47,7 @@ class Node:
         return self.__last_pose
     
     @last_pose.setter
-    def last_pose(self, last_pose: set):
+    def last_pose(self, last_pose: int):
         self.__last_pose = last_pose
     
     @property
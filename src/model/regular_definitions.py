@@ -1,25 +1,76 @@
 from src.model.regular_expression import RegularExpression
 from src.model.finite_automata import FiniteAutomata
+from src.model.compiled_automata import CompiledAutomata
+from src.model.lazy_automata import LazyAutomata
+from src.model.tree import Tree
 from src.utils.paths import FA_OUTPUT_DIR
+from src.utils import lexer_cache
+from src.utils.parallel_compilation import compile_definition, compile_definitions_in_parallel
 
 from pathlib import Path
-from typing import Dict, List
+from typing import Dict, List, Set
 
 
 class RegularDefinitions:
     """
     Classe que representa as definições regulares de entrada para o analisador léxico.
     Cada definição, após tratar subdefinições, possui um nome (token), e a RegularExpression correspondente.
+    O autômato compilado é armazenado em um cache em disco, indexado pelo hash do arquivo de definições;
+    quando há uma entrada válida no cache, a conversão das expressões e a construção do autômato são dispensadas
+    (e as definições permanecem em sua forma textual).
+    Caso contrário, o artefato compilado de cada definição também é buscado no cache, pelo hash do seu texto resolvido
+    (ver _compile_definitions): após editar o arquivo, apenas as definições alteradas e as que dependem delas
+    são analisadas e compiladas novamente, antes de reconstruir o autômato geral.
+    Com lazy_states_limit, o AFD não é construído: o AFND da união é determinizado sob demanda por um
+    LazyAutomata, com cache limitado a essa quantidade de estados.
+    Com compile_workers, as definições são compiladas (árvore, followpos e AFD por token) por um conjunto de processos,
+    com o mesmo resultado da compilação sequencial; compile_workers = 0 usa um processo por CPU.
+    O arquivo e o diagrama do autômato são gerados apenas quando solicitados (ver generate_automata_artifacts).
     """
-    def __init__(self, regular_definitions_file: Path):
+    def __init__(
+        self,
+        regular_definitions_file: Path,
+        direct_construction: bool = True,
+        use_cache: bool = True,
+        lazy_states_limit: int = None,
+        compile_workers: int = None
+    ):
         self.__tokens: List[str] = list()
         self.__regular_definitions: Dict[str, str|RegularExpression] = dict() #mapeia o nome da definição pra regex / grupo
         self.__regular_definitions_file: Path = regular_definitions_file
         self.__automata: FiniteAutomata = None
+        self.__compiled_automata: CompiledAutomata = None
+        self.__lazy_automata: LazyAutomata = None
+        self.__determinized_states_count: int = 0
+        self.__minimized_states_count: int = 0
     
+        self.__sources: Dict[str, str] = dict()  # texto de cada definição, como lido do arquivo
+        self.__dependencies: Dict[str, List[str]] = None
+        self.__use_cache: bool = use_cache
+        self.__compile_workers: int = compile_workers
+
         self._read_regular_definitions()
-        self.convert_regular_definitions_to_regular_expressions()
-        self.regular_expressions_automata_union()
+
+        if lazy_states_limit is not None:
+            self.automata = self._regular_expressions_nfa_union()
+            self.lazy_automata = LazyAutomata(self.automata, self.tokens, lazy_states_limit)
+            return
+
+        cache_key = lexer_cache.cache_key(regular_definitions_file, "direct" if direct_construction else "union")
+        if not (use_cache and self._load_from_cache(cache_key)):
+            if direct_construction:
+                self.regular_expressions_direct_automata()
+            else:
+                self.regular_expressions_automata_union()
+            if use_cache:
+                self._store_in_cache(cache_key)
+
+    def generate_automata_artifacts(self):
+        """
+        Salva o autômato resultante e seu diagrama nos diretórios padrão, para exibição na interface.
+        """
+        self.automata.to_file(str(FA_OUTPUT_DIR / "af_output.txt"))
+        self.automata._generate_finite_automata_diagram()
 
     
     def _read_regular_definitions(self): 
@@ -41,80 +92,204 @@ class RegularDefinitions:
                 raise ValueError("Má formação: definições regulares esperadas na forma 'token: expressao'")
             self.tokens.append(token)
             self.regular_definitions[token] = regular_expression
+            self.__sources[token] = regular_expression
 
-    def _verify_subexpressions(self, regex: str):
-        """
-        Verifica formação de uma expressão regex contendo subexpressões,
-        i.e. contendo definições de tokens declaradas previamente com <nome_token>.
-        Substitui subexpressões pela expressão regular correspondente.
-        """
-        stack = []
-        subexpressions = set()
-        subexpression = ""
-        last_char = ""
-        for char in regex:
-            is_scape = last_char in ["", "\\"]
-            if subexpression:
-                subexpression = f"{subexpression}{char}"
-            match char:
-                case '<':
-                    if not is_scape:
-                        stack.append("<")
-                        subexpression = f"{subexpression}{char}"
-                case '>':
-                    if not is_scape:
-                        try:
-                            stack.pop()
-                            subexpressions.add(subexpression)
-                            subexpression = ""
-                        except:
-                            raise ValueError(f"Expressão má formada: {regex}")
-            last_char = char
-        
-        if len(stack) > 0:
-            raise ValueError(f"Expressão má formada: {regex}")
-        
-        for subexpression in subexpressions:
-            try:
-                regex_from_token = self.regular_definitions[subexpression[1:-1]]
-            except:
-                raise ValueError(f"Subexpressão má formada: definição {subexpression[1:-1]} inexistente")
-            regex = regex.replace(subexpression, f"({regex_from_token})")
-        
-        return regex
+    def _dependency_graph(self) -> Dict[str, List[str]]:
+        """
+        Retorna, para cada definição, as definições que ela referencia (<nome>), calculadas uma única vez.
+        """
+        if self.__dependencies is None:
+            self.__dependencies = {
+                token: RegularExpression.references(regular_expression)
+                for token, regular_expression in self.__sources.items()
+            }
+        return self.__dependencies
+
+    def _resolution_order(self) -> List[str]:
+        """
+        Retorna as definições em ordem topológica do grafo de dependências (referências <nome>):
+        cada definição aparece depois de todas as que ela referencia.
+        Gera exceção para referências a definições inexistentes e para dependências cíclicas.
+        """
+        dependencies = self._dependency_graph()
+
+        order = []
+        visited = set()
+        for root in dependencies:
+            if root in visited:
+                continue
+            # Busca em profundidade iterativa; path contém as definições em visita (para detectar ciclos)
+            path = [root]
+            on_path = {root}
+            pending = [iter(dependencies[root])]
+            visited.add(root)
+            while pending:
+                dependency = next(pending[-1], None)
+                if dependency is None:
+                    on_path.discard(path[-1])
+                    order.append(path.pop())
+                    pending.pop()
+                    continue
+                if dependency not in dependencies:
+                    raise ValueError(f"Subexpressão má formada: definição {dependency} inexistente")
+                if dependency in on_path:
+                    cycle = path[path.index(dependency):] + [dependency]
+                    raise ValueError(f"Definições regulares cíclicas: {' -> '.join(cycle)}")
+                if dependency not in visited:
+                    visited.add(dependency)
+                    path.append(dependency)
+                    on_path.add(dependency)
+                    pending.append(iter(dependencies[dependency]))
+        return order
     
-    def convert_regular_definitions_to_regular_expressions(self):
+    def convert_regular_definitions_to_regular_expressions(self, tokens: Set[str] = None):
         """
-        Instancia as expressões regulares correspondentes a cada definição,
+        Instancia as expressões regulares correspondentes a cada definição (ou apenas às de tokens),
         construindo o dicionário regular_definitions.
+        As definições são analisadas uma única vez, em ordem topológica (ver _resolution_order):
+        cada referência <nome> usa a notação pós-fixa da definição já analisada, sem substituição textual.
+        Portanto, tokens deve conter também as definições referenciadas pelas suas definições.
+        """
+        for token in self._resolution_order():
+            if (tokens is None or token in tokens) and not isinstance(self.regular_definitions[token], RegularExpression):
+                self.regular_definitions[token] = RegularExpression(self.regular_definitions[token], token, self.regular_definitions)
+
+    def _literal_definitions(self) -> Dict[str, str]:
+        """
+        Retorna, na ordem das definições, as definições formadas apenas por literais (palavras reservadas, operadores),
+        mapeadas para a palavra que representam (ver RegularExpression.literal).
+        """
+        literals = {}
+        for token in self.tokens:
+            word = RegularExpression.literal(self.__sources[token])
+            if word is not None:
+                literals[token] = word
+        return literals
+
+    def _compile_definitions(self, construction_mode: str) -> List[Tree | FiniteAutomata]:
+        """
+        Retorna os artefatos compilados das definições: a árvore já calculada, compacta (construção direta),
+        ou o AFD do token (união dos autômatos), de cada definição baseada em padrões, na ordem das definições,
+        seguidos de um único artefato para todas as definições literais, montado como uma trie (ver Tree.trie),
+        sem passar por RegularExpression. A prioridade entre os tokens é a ordem das definições, independente
+        da ordem dos artefatos, pois é aplicada na determinização do autômato geral.
+        Com o cache habilitado, cada artefato é buscado pela chave da definição, que combina o seu texto com as chaves
+        das definições que ela referencia (ver lexer_cache.definition_key). Apenas as definições sem artefato no cache
+        (alteradas, ou que dependem de uma definição alterada) são analisadas, junto das que elas referenciam,
+        e compiladas; os novos artefatos são salvos no cache.
+        Com compile_workers, a compilação dessas definições é dividida entre processos (ver utils/parallel_compilation).
         """
-        for token in self.regular_definitions:
-            for token_to_update, regular_expression_to_update in self.regular_definitions.items():
-                new_regular_expression = self._verify_subexpressions(regular_expression_to_update)
-                self.regular_definitions[token_to_update] = new_regular_expression
-                        
-        for token, regular_expression in self.regular_definitions.items():
-            self.regular_definitions[token] = RegularExpression(regular_expression, token)
+        literals = self._literal_definitions()
+        patterns = [token for token in self.tokens if token not in literals]
+        dependencies = self._dependency_graph()
+        keys: Dict[str, str] = {}
+        for token in self._resolution_order():
+            dependency_keys = [keys[dependency] for dependency in dependencies[token]]
+            keys[token] = lexer_cache.definition_key(token, self.__sources[token], dependency_keys, construction_mode)
+
+        artifacts: Dict[str, Tree | FiniteAutomata] = {}
+        if self.__use_cache:
+            for token in patterns:
+                artifact = lexer_cache.load_definition_artifact(keys[token])
+                if artifact is not None:
+                    artifacts[token] = artifact
+
+        missing = [token for token in patterns if token not in artifacts]
+        required = set()
+        pending = list(missing)
+        while pending:
+            token = pending.pop()
+            if token not in required:
+                required.add(token)
+                pending.extend(dependencies[token])
+        self.convert_regular_definitions_to_regular_expressions(required)
+
+        postfixes = [self.regular_definitions[token].postfix for token in missing]
+        if self.__compile_workers is None:
+            compiled_missing = [compile_definition(postfix, construction_mode) for postfix in postfixes]
+        else:
+            compiled_missing = compile_definitions_in_parallel(postfixes, construction_mode, self.__compile_workers)
+
+        for token, artifact in zip(missing, compiled_missing):
+            artifacts[token] = artifact
+            if construction_mode == "union":
+                self.regular_definitions[token].automata = artifact
+            if self.__use_cache:
+                lexer_cache.store_definition_artifact(keys[token], artifacts[token])
+
+        compiled = [artifacts[token] for token in patterns]
+        if literals:
+            trie = Tree.trie(list(literals.items()))
+            compiled.append(trie if construction_mode == "direct" else trie.generate_automata(token_priority=self.tokens))
+        return compiled
         
     def regular_expressions_automata_union(self):
         """
         Realiza a união dos autômatos correspondente a cada uma das definições,
-        gerando um autômato geral, determinizando-o.
+        gerando um autômato geral, determinizando-o, minimizando-o e compilando-o para execução.
+        """
+        self._minimize_and_compile(self._regular_expressions_nfa_union().determinize(self.__tokens))
+
+    def _regular_expressions_nfa_union(self) -> FiniteAutomata:
         """
-        automatas: List[FiniteAutomata] = list()
-        for regular_expression in self.regular_definitions.values():
-            automatas.append(regular_expression.automata)
+        Retorna o AFND resultante da união dos autômatos correspondentes a cada uma das definições.
+        """
+        automatas: List[FiniteAutomata] = self._compile_definitions("union")
         
         while len(automatas) != 1:
             automata1, automata2 = automatas[0:2]
             new_automata = FiniteAutomata.union(automata1, automata2)
             automatas = automatas[2:]
             automatas.append(new_automata)
-        
-        self.automata = automatas[0].determinize(self.__tokens)
-        self.automata.to_file(str(FA_OUTPUT_DIR / "af_output.txt"))
 
-        self.automata._generate_finite_automata_diagram()       
+        return automatas[0]
+
+    def regular_expressions_direct_automata(self):
+        """
+        Constrói diretamente o AFD geral a partir de uma única árvore na forma (r1#1 | r2#2 | ... | rn#n),
+        com um marcador de fim distinto por token, montada pela união das árvores já calculadas de cada definição
+        e da trie das definições literais (ver Tree.union), de modo que o followpos de uma definição não alterada
+        vem do cache.
+        Dispensa os AFDs por token, a união dos AFNs e a segunda determinização.
+        """
+        tree = Tree.union(self._compile_definitions("direct"))
+        self._minimize_and_compile(tree.generate_automata(token_priority=self.__tokens))
+
+    def _minimize_and_compile(self, determinized: FiniteAutomata):
+        """
+        Minimiza o AFD geral, registrando a quantidade de estados antes e depois da minimização,
+        e compila-o para execução.
+        """
+        self.automata = determinized.minimize()
+        self.__determinized_states_count = len(determinized.states)
+        self.__minimized_states_count = len(self.automata.states)
+        self.compiled_automata = self.automata.compile()
+
+    def _load_from_cache(self, cache_key: str) -> bool:
+        """
+        Restaura o autômato (incluindo o mapeamento de estados finais para tokens) e sua forma compilada
+        a partir do cache em disco. Retorna False caso não exista entrada válida para a chave.
+        """
+        entry = lexer_cache.load_compiled_lexer(cache_key)
+        if entry is None or entry["tokens"] != self.tokens:
+            return False
+        self.automata = entry["automata"]
+        self.compiled_automata = entry["compiled_automata"]
+        self.__determinized_states_count = entry["determinized_states_count"]
+        self.__minimized_states_count = entry["minimized_states_count"]
+        return True
+
+    def _store_in_cache(self, cache_key: str):
+        """
+        Salva o autômato e sua forma compilada no cache em disco.
+        """
+        lexer_cache.store_compiled_lexer(cache_key, {
+            "tokens": self.tokens,
+            "automata": self.automata,
+            "compiled_automata": self.compiled_automata,
+            "determinized_states_count": self.determinized_states_count,
+            "minimized_states_count": self.minimized_states_count,
+        })
         
     def __str__(self):
         return
@@ -137,4 +312,36 @@ class RegularDefinitions:
     
     @automata.setter
     def automata(self, automata: FiniteAutomata):
-        self.__automata = automata
\ No newline at end of file
+        self.__automata = automata
+
+    @property
+    def determinized_states_count(self):
+        return self.__determinized_states_count
+
+    @property
+    def minimized_states_count(self):
+        return self.__minimized_states_count
+
+    @property
+    def lazy_automata(self):
+        return self.__lazy_automata
+
+    @lazy_automata.setter
+    def lazy_automata(self, lazy_automata: LazyAutomata):
+        self.__lazy_automata = lazy_automata
+
+    @property
+    def runner(self) -> CompiledAutomata | LazyAutomata:
+        """
+        Autômato usado para reconhecer as palavras: o LazyAutomata, no modo preguiçoso,
+        ou a forma compilada do AFD.
+        """
+        return self.__lazy_automata if self.__lazy_automata is not None else self.__compiled_automata
+
+    @property
+    def compiled_automata(self):
+        return self.__compiled_automata
+
+    @compiled_automata.setter
+    def compiled_automata(self, compiled_automata: CompiledAutomata):
+        self.__compiled_automata = compiled_automata
\ No newline at end of file
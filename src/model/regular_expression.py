@@ -1,7 +1,9 @@
-from typing import List, Tuple
+import re
+from typing import Dict, List, Optional, Tuple
 from src.model.node import Node
 from src.model.tree import Tree
 from src.model.finite_automata import FiniteAutomata
+from src.utils.character_classes import class_label, normalize_intervals
 
 
 class RegularExpression:
@@ -9,28 +11,31 @@ class RegularExpression:
     Classe que representa uma expressão regular.
     Possui métodos que verificam má formações, e trata a expressão
     para convertê-la em um AFD correspondente.
+    Com fragments (definições já analisadas, por nome), referências <nome> na expressão são substituídas
+    pela notação pós-fixa da definição correspondente, sem analisá-la novamente.
     """
 
-    # Constante com a precedência dos operadores primitivos, utilizados na conversão para AFD
-    PRECEDENCE = {
-        "*": 2,
-        ".": 1,
-        "|": 0
-    }
-
     # Constante listando os operadores considerados, para distingui-los de literais
     OPERATORS = ['(', ")", "[", "]", "*", "|", ".", "?", "+", "&", "-"]
 
-    def __init__(self, value: str, token_name:str = ""):
+    # Quantificadores (operadores unários pós-fixos), além da repetição limitada {m,n}
+    QUANTIFIERS = ["*", "+", "?"]
+
+    # Repetição limitada: {m}, {m,} ou {m,n}. '{' só é tratado como operador quando seguido de dígitos
+    REPEAT_PATTERN = re.compile(r"\{(\d+)(,(\d*))?\}")
+
+    def __init__(self, value: str, token_name:str = "", fragments: Dict[str, "RegularExpression"] = None):
         self.__infix: List[Tuple[str, str]] = list()
         self.__postfix: list = list()
         self.__token_name: str = token_name
+        self.__fragments: Dict[str, RegularExpression] = fragments
         self.__automata: FiniteAutomata = None
+        self.__position: int = 0  # posição atual na notação infixa durante a análise sintática
         self.generate_infix(value)
         self.generate_postfix()
-        self.convert_to_finite_automata()
 
-    def _remove_whitespaces(self, value: str):
+    @staticmethod
+    def _remove_whitespaces(value: str):
         """
         Desconsidera quaisquer espaços em branco da expressão,
         retornando a nova expressão com estes removidos.
@@ -38,22 +43,73 @@ class RegularExpression:
         return value.replace(" ", "").replace("\n", "").replace("\t", "")
 
     def _tokenize(self, value: str):
+        """
+        Tokeniza a expressão regular, preenchendo a notação infixa (ver tokenize).
+        """
+        self.infix = self.tokenize(value, self.__fragments is not None)
+
+    @classmethod
+    def references(cls, value: str) -> List[str]:
+        """
+        Retorna os nomes das definições referenciadas (<nome>) pela expressão, na ordem em que aparecem.
+        """
+        tokens = cls.tokenize(cls._remove_whitespaces(value), True)
+        return [name for token_type, name in tokens if token_type == "REFERENCE"]
+
+    @classmethod
+    def literal(cls, value: str) -> Optional[str]:
+        """
+        Retorna a palavra representada pela expressão caso ela seja formada apenas por literais
+        (ex: palavras reservadas e operadores), ou None caso contenha operadores ou referências.
+        """
+        tokens = cls.tokenize(cls._remove_whitespaces(value), True)
+        if not tokens or any(token_type != "LITERAL" for token_type, _ in tokens):
+            return None
+        return "".join(char for _, char in tokens)
+
+    @classmethod
+    def tokenize(cls, value: str, with_references: bool = False) -> List[Tuple[str, str]]:
         """
         Tokeniza a expressão regular em tokens do tipo LITERAL, ou OPERATOR.
         Utiliza o caractere \ como escape para tratar qualquer símbolo após ele como LITERAL.
+        Uma repetição limitada ({m}, {m,} ou {m,n}) vira um único token OPERATOR.
+        Com with_references, cada referência <nome> a outra definição vira um token REFERENCE.
         Verifica má formação relacionadas à parênteses/colchetes.
         """
+        tokens = []
         brackets_stack = []
         last_char = "#"
-        for c in value:
+        index = 0
+        while index < len(value):
+            c = value[index]
+            index += 1
             if (c == "s" and last_char == '\\'):
                 c = " "
             elif (c == "\\" or c == ".") and last_char != "\\":
                 last_char = c
                 continue
 
+            if with_references and c in ["<", ">"] and last_char != "\\":
+                end = value.find(">", index)
+                if c == ">" or end == -1:
+                    raise ValueError(f"Expressão má formada: {value}")
+                tokens.append(("REFERENCE", value[index:end]))
+                index = end + 1
+                last_char = ">"
+                continue
+
+            if c == "{" and last_char != "\\" and value[index:index + 1].isdigit():
+                match = cls.REPEAT_PATTERN.match(value, index - 1)
+                if match is None:
+                    raise ValueError(f"Repetição inválida: {value[index - 1:]}")
+                cls.repeat_bounds(match.group())
+                tokens.append(("OPERATOR", match.group()))
+                index = match.end()
+                last_char = "}"
+                continue
+
             token_type = "LITERAL"
-            if c in self.OPERATORS and last_char != "\\":
+            if c in cls.OPERATORS and last_char != "\\":
                 token_type = "OPERATOR"
                 if c == "(":
                     brackets_stack.append("(")
@@ -72,219 +128,241 @@ class RegularExpression:
                     except:
                         raise ValueError(f"Expressão com má formação de colchetes")
 
-            self.infix.append((token_type, c))
+            tokens.append((token_type, c))
             last_char = "#" if c == "\\" and last_char == "\\" else c
 
         if len(brackets_stack) > 0:
             raise ValueError(f"Expressão com má formação de parênteses e/ou colchetes")
-        
+        return tokens
 
-    def _update_to_primitive_operators(self):
-        """
-        Valida cada token da expressão, deixando-a apenas com os operadores primitivos : *, . e |
-        Expande grupos/sequências, insere concatenações e gera exceções de má formação.
-        """
-        stack = []
-        last_token = ("OPERATOR", str())
-        is_sequence = False
-        for type, char in self.infix:
-            token = (type, char)
-            insert_concat = not is_sequence and \
-                            ((last_token[0] == "OPERATOR" and last_token[1] not in ["", "(", "[", "|", ".", "-"]) or (last_token[0] == "LITERAL")) and \
-                            ((type == "OPERATOR" and char not in ["", "?", "*", "+", ".", "|", "]", ")", "-"]) or (type == "LITERAL"))
-            invalid_expr_pairs = {
-                                    (("OPERATOR", "("), ("OPERATOR", sym)) for sym in "*?+.|"
-                                }.union({
-                                    (("OPERATOR", "["), ("OPERATOR", sym)) for sym in "*?+.|"
-                                }).union({
-                                    (("OPERATOR", ""), ("OPERATOR", sym)) for sym in "*?+.|"
-                                }).union({
-                                    (("OPERATOR", "|"), ("OPERATOR", sym)) for sym in "*?+.|"
-                                }).union({
-                                    (("OPERATOR", "*"), ("OPERATOR", sym)) for sym in "*?+."
-                                })
-            if (last_token, token) in invalid_expr_pairs:
-                raise ValueError(f"Expressão inválida: {last_token[1]}{char}. Considere, se for o caso, o uso de parênteses para evitar ambiguidade.")
-            concat_token = ("OPERATOR", ".")
-            if type == "OPERATOR":
-                match char:
-                    case ']':
-                        is_sequence = False
-                        group = self._find_last_group_by_stack(stack, is_sequence=True)
-                        group_expanded = self._expand_group(group)
-                        if insert_concat:
-                            group_expanded.insert(0, concat_token)
-                        stack.extend(group_expanded)
-                    case '?':
-                        last_type, last_char = stack.pop()
-                        group_optional = None
-                        if last_type == "LITERAL": #substitui a? por (a|&)
-                            group_optional = [("OPERATOR", "("), ("LITERAL", last_char), ("OPERATOR", "|"), ("OPERATOR", "&"), ("OPERATOR", ")")]
-                        elif last_char == ")": #substitui (expr)? por (expr | &)
-                            group_optional = [("OPERATOR", "|"), ("OPERATOR", "&"), ("OPERATOR", ")")]
-                        else:
-                            ValueError(f"Expressão com operador '?' inválida: {last_char}?")
-                        if insert_concat:
-                            group_optional.insert(0, concat_token)
-                        stack.extend(group_optional)
-                    case '+':
-                        last_type, last_char = stack.pop()
-                        group = None
-                        if last_type == "LITERAL": #substitui a+ por (aa*)
-                            group = [("OPERATOR", "("), ("LITERAL", last_char), concat_token, ("LITERAL", last_char), ("OPERATOR", "*"), ("OPERATOR", ")")]
-                        elif last_char == ")": #substitui (expr)+ por ((expr)(expr)*)
-                            group = self._find_last_group_by_stack(stack)
-                            aux = group[:]
-                            aux.insert(0, concat_token)
-                            group.extend(aux)
-                            group.insert(0, ("OPERATOR", "("))
-                            group.extend([("OPERATOR", "*"), ("OPERATOR", ")")])
-                        else:
-                            ValueError(f"Expressão com operador '+' inválida: {last_char}?")
-                        if insert_concat:
-                            group.insert(0, concat_token)
-                        stack.extend(group)
-                    case _:
-                        if char == "[":
-                            is_sequence = True
-                        elif char == "-" and not is_sequence:
-                            raise ValueError("Operador '-' permitido apenas dentro de sequências. Para usar o literal '-' escape com '\\-'")
-                        token_inserted = [token]
-                        if insert_concat:
-                            token_inserted.insert(0, concat_token)
-                        stack.extend(token_inserted)
-            else:
-                token_inserted = [token]
-                if insert_concat:
-                    token_inserted.insert(0, concat_token)
-                stack.extend(token_inserted)
-            last_token = stack[-1]
-        self.infix = stack
-
-    def _find_last_group_by_stack(self, stack: list, is_sequence: bool = False):
-        """
-        Procura o último parênteses (ou colchetes se is_sequence) de abertura em uma pilha (stack),
-        validando a formação de parêntes e colchetes, e retornando o grupo limitado por tal caracteres de abertura e fechamento.
-        Desconsidera qualquer caractere LITERAL nessa busca.
-        """
-        open_char = "[" if is_sequence else "("
-        close_char = "]" if is_sequence else ")"
-        substack = []
-        group = [("OPERATOR", close_char)]
-        while len(stack) > 0:
-            token_type, token_char = stack.pop()
-            group.insert(0, (token_type, token_char))
-            if token_type == "OPERATOR":
-                if token_char == open_char:
-                    if len(substack) == 0:
-                        return group
-                    else:
-                        substack.pop()
-                elif token_char == close_char:
-                    substack.append(token_char)
-        raise ValueError(f"Expressão com má formação de '{open_char}{close_char}'")
+    @classmethod
+    def repeat_bounds(cls, repeat: str) -> Tuple[int, Optional[int]]:
+        """
+        Retorna os limites (mínimo, máximo) de uma repetição {m}, {m,} ou {m,n}, com máximo None se ilimitada.
+        Gera exceção se o máximo for menor que o mínimo.
+        """
+        match = cls.REPEAT_PATTERN.fullmatch(repeat)
+        minimum = int(match.group(1))
+        if match.group(2) is None:
+            return minimum, minimum
+        maximum = int(match.group(3)) if match.group(3) else None
+        if maximum is not None and maximum < minimum:
+            raise ValueError(f"Repetição inválida: {repeat}")
+        return minimum, maximum
+
+    def _is_quantifier(self, token: Tuple[str, str]) -> bool:
+        return token[0] == "OPERATOR" and (token[1] in self.QUANTIFIERS or token[1].startswith("{"))
+
+    def _peek(self) -> Optional[Tuple[str, str]]:
+        """
+        Retorna o token atual da notação infixa, ou None ao final da expressão.
+        """
+        return self.infix[self.__position] if self.__position < len(self.infix) else None
+
+    def _invalid_expression(self, last_char: str, char: str) -> ValueError:
+        return ValueError(f"Expressão inválida: {last_char}{char}. Considere, se for o caso, o uso de parênteses para evitar ambiguidade.")
+
+    def _parse_alternation(self, last_char: str):
+        """
+        expressão → termo ('|' termo)*
+        """
+        self._parse_concatenation(last_char)
+        while self._peek() == ("OPERATOR", "|"):
+            self.__position += 1
+            self._parse_concatenation("|")
+            self.postfix.append(("OPERATOR", "|"))
+
+    def _parse_concatenation(self, last_char: str):
+        """
+        termo → fator fator*, sendo last_char o operador anterior ao termo ("" no início da expressão).
+        """
+        token = self._peek()
+        if token is None or token in [("OPERATOR", "|"), ("OPERATOR", ")")]:
+            raise self._invalid_expression(last_char, token[1] if token else "")
+
+        self._parse_repetition(last_char)
+        while self._peek() is not None and self._peek() not in [("OPERATOR", "|"), ("OPERATOR", ")")]:
+            self._parse_repetition(self.infix[self.__position - 1][1])
+            self.postfix.append(("OPERATOR", "."))
+
+    def _parse_repetition(self, last_char: str):
+        """
+        fator → átomo quantificador*, com os quantificadores *, +, ? e {m,n} como nós nativos da árvore.
+        """
+        token = self._peek()
+        if self._is_quantifier(token):
+            raise self._invalid_expression(last_char, token[1])
+
+        last_token = self._parse_atom()
+        while self._peek() is not None and self._is_quantifier(self._peek()):
+            token = self._peek()
+            if last_token == ("OPERATOR", "*") and token[1] in self.QUANTIFIERS:
+                raise self._invalid_expression(last_token[1], token[1])
+            if last_token == ("OPERATOR", "&") and token[1] in ["?", "+"]:
+                raise ValueError(f"Expressão com operador '{token[1]}' inválida: {last_token[1]}?")
+            self.postfix.append(token)
+            self.__position += 1
+            last_token = token
+
+    def _parse_atom(self) -> Tuple[str, str]:
+        """
+        átomo → literal | & | <nome> | '(' expressão ')' | '[' grupo ']'. Retorna o último token do átomo.
+        """
+        token_type, char = token = self.infix[self.__position]
+        self.__position += 1
+        if token_type == "LITERAL" or char == "&":
+            self.postfix.append(token)
+            return token
+        if token_type == "REFERENCE":
+            fragment = self.__fragments.get(char)
+            if not isinstance(fragment, RegularExpression):
+                raise ValueError(f"Subexpressão má formada: definição {char} inexistente")
+            self.postfix.extend(fragment.expression_postfix)
+            return token
+
+        match char:
+            case "(":
+                self._parse_alternation("(")
+                if self._peek() != ("OPERATOR", ")"):
+                    raise ValueError(f"Expressão com má formação de parênteses")
+                self.__position += 1
+                return ("OPERATOR", ")")
+            case "[":
+                self._parse_group()
+                return ("OPERATOR", "]")
+            case "-":
+                raise ValueError("Operador '-' permitido apenas dentro de sequências. Para usar o literal '-' escape com '\\-'")
+            case _:
+                raise self._invalid_expression("", char)
+
+    def _parse_group(self):
+        """
+        grupo → (literal | literal '-' literal | &)+, delimitado pelos colchetes, convertido em uma classe de caracteres.
+        """
+        start = self.__position - 1
+        end = start + 1
+        while self.infix[end] != ("OPERATOR", "]"):
+            end += 1
+        group = self.infix[start:end + 1]
+        if len(group) > 2 and group[1][0] == "OPERATOR" and group[1][1] in ["*", "?", "+", ".", "|"]:
+            raise self._invalid_expression("[", group[1][1])
+
+        self.postfix.extend(self._expand_group(group))
+        self.__position = end + 1
 
     def _expand_group(self, group: list):
         """
-        Expande um grupo/sequência do tipo [A-Za-z0-9] ou [ABCDEF...] para (A | B | C | ...).
+        Converte um grupo/sequência do tipo [A-Za-z0-9] ou [ABCDEF...] em um único LITERAL
+        cujo valor é o rótulo da classe de caracteres (ex: [0-9A-Za-z]), mantida como intervalos
+        em vez de ser expandida para (A | B | C | ...). Grupos contendo & tornam-se (classe | &).
+        Retorna a classe na notação pós-fixa.
         Valida exceções de má formação no grupo em questão.
         """
         index_token = 1
-        sequence = set()
+        intervals = []
+        has_empty = False
         for token_type, token_char in group[1:-1]:
-            token = (token_type, token_char)
             prev = group[index_token-1]
             pos = group[index_token+1]
-            if token_type == "LITERAL" or token_char == "&":
-                sequence.add(token)
+            if token_type == "LITERAL":
+                intervals.append((ord(token_char), ord(token_char)))
+            elif token_char == "&":
+                has_empty = True
             elif token_char == "-":
                 if prev[0] != "OPERATOR" and pos[0] != "OPERATOR":
-                    sequence = sequence.union(self._generate_sequence(prev, pos))
+                    intervals.append(self._generate_sequence(prev, pos))
                 else:
                     raise ValueError(f"Grupo inválido: {prev[1]}-{pos[1]}")
             else:
                 raise ValueError(f"Grupo inválido: [...{token_char}...]")
 
             index_token += 1
-        
-        sequence = list(sequence)
-        expanded_group = [("OPERATOR", "("), sequence.pop(0)]
-        for token in sequence:
-            expanded_group.extend([("OPERATOR", "|"), token])
-        expanded_group.append(("OPERATOR", ")"))
+
+        if not intervals and not has_empty:
+            raise ValueError("Grupo inválido: []")
+
+        expanded_group = []
+        if intervals:
+            expanded_group.append(("LITERAL", class_label(normalize_intervals(intervals))))
+        if has_empty:
+            expanded_group.append(("OPERATOR", "&"))
+            if intervals:
+                expanded_group.append(("OPERATOR", "|"))
         return expanded_group
 
     def _generate_sequence(self, prev: Tuple, pos: Tuple):
         """
-        Dado um grupo com uma sequência do tipo A-Z ou 0-9, retorna um conjunto
-        com todos os caracteres inclusos na sequência.
+        Dado um grupo com uma sequência do tipo A-Z ou 0-9, retorna o intervalo
+        de code points correspondente à sequência.
         Gera exceção em caso de sequência inválida, como [A-9] ou [A-z] ou [Z-A]
         """
         start, end = prev[1], pos[1]
         if start.isalpha() and end.isalpha() and start.isupper() and end.isupper() and start <= end:
-            return set([("LITERAL", chr(c)) for c in range(ord(start), ord(end) + 1)])
+            return (ord(start), ord(end))
         elif start.isalpha() and end.isalpha() and start.islower() and end.islower() and start <= end:
-            return set([("LITERAL", chr(c)) for c in range(ord(start), ord(end) + 1)])
+            return (ord(start), ord(end))
         elif start.isdigit() and end.isdigit() and start <= end:
-            return set([("LITERAL", chr(c)) for c in range(ord(start), ord(end) + 1)])
+            return (ord(start), ord(end))
         else:
             raise ValueError(f"Sequência inválida: [{start}-{end}]")
         
     def generate_infix(self, value: str):
         """
-        Método principal que gera a notação infixa da expressão de entrada.
+        Método principal que gera a notação infixa (lista de tokens) da expressão de entrada.
         Utiliza os demais métodos para tratar e validar a expressão.
-        Inclui a concatenação com o literal # no final, preparando a expressão para
-        convertê-la em um AFD.
         """
         value = self._remove_whitespaces(value)
         self._tokenize(value)
-        self._update_to_primitive_operators()
-        self.infix.insert(0, ("OPERATOR", "("))
-        self.infix.extend([("OPERATOR", ")"), ("OPERATOR", "."), ("LITERAL", "#")])
 
     def generate_postfix(self):
         """
-        Com base na notação infixa previamente tratada, gera a notação pós fixa da expressão
-        eliminando parênteses (do tipo OPERATOR) nesse processo.
+        Analisa a notação infixa por descida recursiva, gerando a árvore sintática da expressão em pós-ordem
+        (notação pós-fixa), com os operadores |, . (concatenação implícita), *, +, ? e {m,n} como nós nativos:
+        nenhuma subexpressão é duplicada, de modo que a notação pós-fixa é linear no tamanho da expressão.
+        Inclui a concatenação com o marcador de fim # no final (do tipo END, associado ao nome do token),
+        preparando a expressão para convertê-la em um AFD.
+        Gramática:
+            expressão → termo ('|' termo)*
+            termo → fator fator*
+            fator → átomo quantificador*
+            átomo → literal | & | <nome> | '(' expressão ')' | '[' grupo ']'
         """
-        stack = []
-
-        for type, char in self.infix:
-            token = (type, char)
-            if type == "OPERATOR" and char != "&":
-                if char == "(":
-                    stack.append(token)
-                elif char == ")":
-                    while stack and stack[-1][0] == "OPERATOR" and stack[-1][1] != "(":
-                        self.postfix.append(stack.pop())
-                    stack.pop()
-                else:
-                    while (stack and stack[-1][0] == "OPERATOR" and stack[-1][1] != "(" and
-                           self.PRECEDENCE.get(char, 0) <= (0 if stack[-1][0] == "LITERAL" else self.PRECEDENCE.get(stack[-1][1], 0))):
-                        self.postfix.append(stack.pop())
-                    stack.append(token)
-            else:
-                self.postfix.append(token)
+        self.__position = 0
+        self._parse_alternation("")
+        self.postfix.extend([("END", self.token_name), ("OPERATOR", ".")])
 
-        while stack:
-            self.postfix.append(stack.pop())
+    @property
+    def expression_postfix(self) -> list:
+        """
+        Notação pós-fixa da expressão sem o marcador de fim, usada como fragmento pelas definições que a referenciam.
+        """
+        return self.postfix[:-2]
 
     def convert_regular_expression_to_tree(self) -> Tree:
         """
         Converte a expressão na forma pós-fixa para a árvore de
         conversão ER -> AFD.
         """
+        return self.convert_postfix_to_tree(self.postfix)
+
+    @staticmethod
+    def convert_postfix_to_tree(postfix: list) -> Tree:
+        """
+        Converte uma expressão na forma pós-fixa para a árvore de conversão ER -> AFD.
+        Cada marcador de fim (END) vira uma folha # associada ao nome do seu token,
+        o que permite montar uma única árvore para várias expressões, na forma (r1#1 | r2#2 | ...).
+        *, + e ? viram nós unários; uma repetição {m,n} é montada pela árvore a partir de cópias da subárvore
+        (ver Tree.repeat). As folhas recebem posições inteiras consecutivas, a partir de 1.
+        """
         stack = list()
-        counter = 0
 
         tree = Tree()
 
-        for type, char in self.postfix:
+        for type, char in postfix:
             node = None
             if type == "OPERATOR":
                 match char:
-                    case "*":
+                    case "*" | "+" | "?":
                         son = stack.pop()
                         node = Node(char, son)
 
@@ -292,16 +370,23 @@ class RegularExpression:
                         right_son = stack.pop()
                         left_son = stack.pop()
                         node = Node(char, left_son, right_son)
-                    
+
+                    case _ if char.startswith("{"):
+                        minimum, maximum = RegularExpression.repeat_bounds(char)
+                        stack.append(tree.repeat(stack.pop(), minimum, maximum))
+                        continue
+
                     case _:
                         node = Node(char)
+            elif type == "END":
+                position = len(tree.follow_pose)
+                node = Node("#", value=position, operator=False)
+                tree.node_value_to_token[position] = "#"
+                tree.acceptance_tokens[position] = char
             else:
-                counter += 1
-                node = Node(char, value=str(counter), operator=False)
-                tree.node_value_to_token[str(counter)] = char
-
-                if char == "#":
-                    tree.acceptance_node = node
+                position = len(tree.follow_pose)
+                node = Node(char, value=position, operator=False)
+                tree.node_value_to_token[position] = char
             
             stack.append(node)
             tree.add_node(node)
@@ -314,9 +399,7 @@ class RegularExpression:
         """
         tree = self.convert_regular_expression_to_tree()
         tree.calculate_nodes_data()
-        self.automata = tree.generate_automata(self.token_name)
-        for state in self.automata.final_states:
-            self.automata.final_state_to_token[state] = self.token_name
+        self.automata = tree.generate_automata()
 
     @property
     def postfix(self):
@@ -340,6 +423,11 @@ class RegularExpression:
 
     @property
     def automata(self):
+        """
+        AFD correspondente à expressão, construído apenas no primeiro acesso.
+        """
+        if self.__automata is None:
+            self.convert_to_finite_automata()
         return self.__automata
     
     @automata.setter
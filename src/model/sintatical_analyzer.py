@@ -1,55 +1,91 @@
-from typing import List, Tuple, Optional
-from prettytable import PrettyTable
-from graphviz import Digraph
+from pathlib import Path
+from typing import TYPE_CHECKING, Iterable, List, Tuple, Optional
 
 from src.model.grammar import Grammar
 from src.model.slr_table import SLRTable
 
 from src.utils.closure_and_canonnical_collection import *
 from src.utils import paths
+import csv
+import itertools
 import math
 
+if TYPE_CHECKING:
+    from prettytable import PrettyTable
+
 
 class SintaticalAnalyzer:
     """
     Classe que representa o Analisador Sintático considerando a gramática SLR de entrada.
     Gera a tabela SLR correspondente.
+    O diagrama de itens canônicos e a tabela SLR formatada (e seu csv) são gerados apenas quando solicitados,
+    de modo que a construção do analisador custe apenas a construção da tabela SLR.
     """
     def __init__(self, grammar_file: str, expected_tokens: Set = None):
         self.grammar: Grammar = Grammar(grammar_file, expected_tokens)
 
         extended_grammar = extend_grammar(self.grammar)
-        collection, transitions = canonical_collection(extended_grammar)
-        self.generate_canonical_items_diagram(collection, transitions)
+        self.collection, self.transitions = canonical_collection(extended_grammar)
         prod_order = get_production_order(extended_grammar)
 
-        self.slr_table: SLRTable = SLRTable(extended_grammar, collection, transitions, prod_order)
-        self.pretty_table = self.slr_table.build_pretty_table()
+        self.slr_table: SLRTable = SLRTable(extended_grammar, self.collection, self.transitions, prod_order)
+        self.__pretty_table: "PrettyTable" = None
         self.tokens_list: list = list()
+
+    @property
+    def pretty_table(self) -> "PrettyTable":
+        """
+        Tabela SLR formatada, construída (e salva em csv no diretório padrão) no primeiro acesso.
+        """
+        if self.__pretty_table is None:
+            self.__pretty_table = self.slr_table.build_pretty_table()
+        return self.__pretty_table
     
-    def read_tokens_from_lexical_analyzer_output(self, file_path: str):
+    def read_tokens_from_lexical_analyzer_output(self, file_path: str, output_path: Path = None):
         """
-        Faz a análise sintática de uma lista de tokens dada em um determinado arquivo, no formato esperado.
+        Faz a análise sintática de uma lista de tokens dada em um determinado arquivo, no formato esperado (<lexema,token>).
+        Como lexemas e tokens podem conter vírgulas, o token é o maior sufixo após uma vírgula que seja
+        um terminal da gramática (ou, caso nenhum seja, o texto após a última vírgula).
+        A tabela de etapas é salva em output_path, ou no diretório padrão.
         """
         self.tokens_list = []
-        with open(file_path, "r") as file:
+        with open(file_path, "r", encoding="utf-8") as file:
             for line in file:
                 line = line.strip()
-                line = line[1:-1]
-                if line == ",,,":
-                    token = ","
-                else:
-                    token = line.split(",")[1]
-                self.tokens_list.append(token)
+                if not line:
+                    continue
+                self.tokens_list.append(self._split_token_line(line[1:-1]))
 
-        pretty_table, input_passed = self.parse_tokens(self.tokens_list)
+        pretty_table, input_passed = self.parse_tokens(self.tokens_list, output_path)
         return pretty_table, input_passed
 
-    def parse_tokens(self, w: List[str]) -> Tuple[PrettyTable, bool]:
+    def _split_token_line(self, line: str) -> str:
+        """
+        Retorna o token de uma linha lexema,token do arquivo de saída do analisador léxico.
+        """
+        comma_index = line.find(",")
+        while comma_index != -1:
+            if line[comma_index + 1:] in self.grammar.terminals:
+                return line[comma_index + 1:]
+            comma_index = line.find(",", comma_index + 1)
+        return line.rsplit(",", 1)[-1]
+
+    def parse_token_stream(self, token_stream: Iterable[Tuple[str, int, int]], output_path: Path = None):
+        """
+        Faz a análise sintática dos tokens produzidos diretamente pelo analisador léxico (ver LexicalAnalyzer.token_stream),
+        como registros (token, início, fim), sem a leitura do arquivo de saída.
+        A tabela de etapas é salva em output_path, ou no diretório padrão.
+        """
+        self.tokens_list = [token for token, _, _ in token_stream]
+        return self.parse_tokens(self.tokens_list, output_path)
+
+    def parse_tokens(self, w: List[str], output_path: Path = None) -> Tuple["PrettyTable", bool]:
         """"
         Método principal que tenta reconhecer uma cadeia, 
         retornando a tabela de etapas e um booleano indicando sucesso ou erro
         """
+        from prettytable import PrettyTable
+
         stack = [0]
         input_buffer = w + ['$'] # Acrescenta o símbolo terminal $ ao final da entrada
         a_index = 0 # Índice do símbolo atual de entrada
@@ -71,7 +107,7 @@ class SintaticalAnalyzer:
             # Caso a ação não esteja definida: erro de análise
             if action is None: 
                 table.add_row([step, stack_repr, input_repr, "ERRO"])
-                self.save_parsing_table(table)
+                self.save_parsing_table(table, output_path)
                 return table, False
             # Ação de deslocamento (shift)
             elif action.startswith('s'):
@@ -101,27 +137,82 @@ class SintaticalAnalyzer:
             # Ação de aceitação
             elif action == 'accept':
                 table.add_row([step, stack_repr, input_repr, "accept"])
-                self.save_parsing_table(table)
+                self.save_parsing_table(table, output_path)
                 return table, True
             # Ação inválida (não é shift, reduce ou accept)
             else:
                 table.add_row([step, stack_repr, input_repr, f"ERRO: ação inválida '{action}'"])
-                self.save_parsing_table(table)
+                self.save_parsing_table(table, output_path)
                 return table, False
 
             step += 1
 
-    # salva a tabela de parsing no diretório padrão
-    def save_parsing_table(self, table: PrettyTable):
+    def parse_stream(self, tokens: Iterable[str], output_path: Path = None) -> bool:
+        """
+        Versão em fluxo de parse_tokens, com memória proporcional à profundidade da pilha:
+        os tokens são consumidos um a um, à medida que são gerados (ver LexicalAnalyzer.stream_tokens),
+        e cada etapa é escrita imediatamente em csv por um arquivo com buffer (output_path, ou o diretório padrão).
+        Como a entrada restante não é conhecida, a coluna Input contém apenas o símbolo atual.
+        Retorna True se a entrada for aceita.
+        """
+        if output_path is None:
+            output_path = paths.PARSING_TABLE_DIR / "parsing_table.csv"
+
+        productions = {index: production for production, index in self.slr_table.prod_order.items()}
+        table = self.slr_table.table
+        input_symbols = itertools.chain(tokens, ["$"])
+        stack = [0]
+        a = next(input_symbols) # Símbolo atual da entrada
+        step = 1
+
+        with open(output_path, "w", encoding="utf-8", newline="", buffering=1 << 16) as file:
+            writer = csv.writer(file)
+            writer.writerow(["#", "Stack", "Input", "Action"])
+
+            while True:
+                action = table.get(stack[-1], {}).get(a)
+                stack_repr = ' '.join(map(str, stack))
+
+                if action is None:
+                    writer.writerow([step, stack_repr, a, "ERRO"])
+                    return False
+                elif action.startswith('s'):
+                    t = int(action[1:])
+                    stack.append(t)
+                    writer.writerow([step, stack_repr, a, f"s{t}"])
+                    a = next(input_symbols, "$") # Após o fim da entrada, o símbolo atual permanece $
+                elif action.startswith('r'):
+                    prod_index = int(action[1:])
+                    head, body = productions[prod_index]
+                    for _ in body:
+                        stack.pop()
+                    stack.append(int(table[stack[-1]][head]))
+                    writer.writerow([step, stack_repr, a, f"r{prod_index} ({head} → {' '.join(body)})"])
+                elif action == 'accept':
+                    writer.writerow([step, stack_repr, a, "accept"])
+                    return True
+                else:
+                    writer.writerow([step, stack_repr, a, f"ERRO: ação inválida '{action}'"])
+                    return False
+
+                step += 1
+
+    # salva a tabela de parsing no caminho informado, ou no diretório padrão
+    def save_parsing_table(self, table: "PrettyTable", output_path: Path = None):
         csv_str = table.get_csv_string()
-        output_path = paths.PARSING_TABLE_DIR / "parsing_table.csv"
+        if output_path is None:
+            output_path = paths.PARSING_TABLE_DIR / "parsing_table.csv"
         with open(output_path, "w", encoding="utf-8") as f:
             f.write(csv_str)
 
-    def generate_canonical_items_diagram(self, collection, transitions):
+    def generate_canonical_items_diagram(self):
         """
         Gera o diagrama de itens canônicos e salva no diretório padrão.
+        O graphviz é importado apenas aqui, já que o diagrama só é usado pela interface.
         """
+        from graphviz import Digraph
+
+        collection, transitions = self.collection, self.transitions
         dot = Digraph(comment="Canonical LR0 Items", format='png')
         dot.attr(rankdir='LR', fontsize='12')
 
@@ -1,7 +1,6 @@
 from typing import Dict, List, Set, Tuple
 from src.model.lr0_item import LR0Item
 from src.model.grammar import Grammar
-from prettytable import PrettyTable
 from src.utils import paths
 
 
@@ -71,8 +70,11 @@ class SLRTable:
 
     def build_pretty_table(self):
         """
-        Imprime a tabela SLR usando PrettyTable.
+        Imprime a tabela SLR usando PrettyTable, e a salva em csv no diretório padrão.
+        O prettytable é importado apenas aqui, já que a tabela formatada só é usada pela interface.
         """
+        from prettytable import PrettyTable
+
         terminals = sorted(self.grammar.terminals) + ["$"]
         non_terminals = sorted(self.grammar.non_terminals - {self.grammar.get_start_symbol()})
         headers = ["STATE"] + terminals + non_terminals
@@ -0,0 +1,89 @@
+from array import array
+from mmap import mmap
+from typing import Dict, Iterator, List, Tuple, Union
+
+
+class TokenStream:
+    """
+    Classe que representa a saída do analisador léxico de forma compacta (estrutura de vetores).
+    Cada token ocupa uma posição em três vetores: o id do token (índice na tabela de nomes internados)
+    e as posições de início e fim do lexema no texto de origem, sem criar objetos Python por token.
+    Os lexemas são criados apenas quando solicitados, a partir de source.
+    source pode ser um texto (posições em caracteres) ou um buffer de bytes em UTF-8, como bytes ou mmap
+    (posições em bytes, com os lexemas decodificados sob demanda).
+    """
+
+    def __init__(self, source: Union[str, bytes, mmap] = "", token_names: List[str] = None):
+        self.source: Union[str, bytes, mmap] = source
+        self.token_names: List[str] = token_names if token_names is not None else list()
+        self.__token_index: Dict[str, int] = {name: index for index, name in enumerate(self.token_names)}
+        self.token_ids: array = array("I")
+        self.starts: array = array("Q")
+        self.ends: array = array("Q")
+
+    def intern(self, token: str) -> int:
+        """
+        Retorna o id do token na tabela de nomes, adicionando-o caso ainda não exista.
+        """
+        token_id = self.__token_index.get(token)
+        if token_id is None:
+            token_id = len(self.token_names)
+            self.token_names.append(token)
+            self.__token_index[token] = token_id
+        return token_id
+
+    def append(self, token: str, start: int, end: int):
+        """
+        Adiciona um token, com o lexema source[start:end], ao final do fluxo.
+        """
+        self.token_ids.append(self.intern(token))
+        self.starts.append(start)
+        self.ends.append(end)
+
+    def extend(self, token_ids: array, starts: array, ends: array):
+        """
+        Adiciona ao final do fluxo os tokens de vetores paralelos, cujos ids referem-se à tabela de nomes deste fluxo.
+        """
+        self.token_ids.extend(token_ids)
+        self.starts.extend(starts)
+        self.ends.extend(ends)
+
+    def token(self, index: int) -> str:
+        return self.token_names[self.token_ids[index]]
+
+    def lexeme(self, index: int) -> str:
+        lexeme = self.source[self.starts[index]:self.ends[index]]
+        return lexeme if isinstance(lexeme, str) else lexeme.decode("utf-8")
+
+    def lexemes(self) -> Iterator[str]:
+        source = self.source
+        if isinstance(source, str):
+            for start, end in zip(self.starts, self.ends):
+                yield source[start:end]
+        else:
+            for start, end in zip(self.starts, self.ends):
+                yield source[start:end].decode("utf-8")
+
+    def __len__(self) -> int:
+        return len(self.token_ids)
+
+    def __iter__(self) -> Iterator[Tuple[str, int, int]]:
+        """
+        Itera pelos tokens como registros (token, início, fim).
+        """
+        token_names = self.token_names
+        for token_id, start, end in zip(self.token_ids, self.starts, self.ends):
+            yield (token_names[token_id], start, end)
+
+    def __getitem__(self, key: Union[int, slice]) -> Union[Tuple[str, int, int], "TokenStream"]:
+        """
+        Com um índice, retorna o registro (token, início, fim); com uma fatia, retorna um novo TokenStream
+        com o mesmo texto de origem e os mesmos ids de tokens.
+        """
+        if isinstance(key, slice):
+            stream = TokenStream(self.source, list(self.token_names))
+            stream.token_ids = self.token_ids[key]
+            stream.starts = self.starts[key]
+            stream.ends = self.ends[key]
+            return stream
+        return (self.token_names[self.token_ids[key]], self.starts[key], self.ends[key])
@@ -1,22 +1,29 @@
 from src.model.node import Node
 from src.model.finite_automata import FiniteAutomata
+from src.model.nfa_bitset_index import iterate_bits
+from src.utils.character_classes import class_label, label_intervals, partition_intervals
 
-from typing import Dict, Set
-from collections import defaultdict
+from typing import Dict, List, Optional, Set, Tuple
+from collections import deque
 
 
 class Tree:
     """
     Classe que representa a árvore utilizada no método de conversão de ER para AFD.
     Implementa o algoritmo de conversão, considerando uma árvore montada para determinada ER.
+    As posições (folhas) são numeradas com inteiros a partir de 1, e first pos, last pos e follow pos
+    são conjuntos de posições representados como máscaras de bits (o bit i corresponde à posição i).
     """
 
     def __init__(self):
         self.__nodes: list[Node] = list()
-        self.__follow_pose: Dict[str, Set[str]] = dict()
+        self.__follow_pose: List[int] = [0]  # follow pos de cada posição (a posição 0 não é usada)
         self.__alphabet: Set[str] = set()
-        self.__node_value_to_token: Dict[str, str] = defaultdict(str)
-        self.__acceptance_node: Node = None
+        self.__leaf_symbols: Dict[str, List[str]] = dict()  # mapeia o rótulo de cada folha para as classes do alfabeto contidas nela
+        self.__node_value_to_token: Dict[int, str] = dict()
+        self.__acceptance_tokens: Dict[int, str] = dict()  # mapeia cada marcador de fim (#) para o nome do token
+        self.__acceptance_mask: int = 0  # posições dos marcadores de fim
+        self.__symbol_positions: Dict[str, int] = dict()  # mapeia cada classe do alfabeto para as posições que a contêm
 
 
     def add_node(self, node: Node):
@@ -40,50 +47,58 @@ class Tree:
     def alphabet(self):
         return self.__alphabet
     
+    @property
+    def leaf_symbols(self):
+        return self.__leaf_symbols
+
     @property
     def node_value_to_token(self):
         return self.__node_value_to_token
     
     @property
-    def acceptance_node(self):
-        return self.__acceptance_node
-    
-    @acceptance_node.setter
-    def acceptance_node(self, node: Node):
-        self.__acceptance_node = node
+    def acceptance_tokens(self):
+        return self.__acceptance_tokens
+
+    @property
+    def symbol_positions(self):
+        return self.__symbol_positions
     
-    def update_follow_pose(self, value:str, follow_pose:set):
+    def update_follow_pose(self, value: int, follow_pose: int):
         """
-        Atualiza o dicionário follow_pose de acordo com um novo valor a ser incluso no conjunto.
+        Atualiza o follow pos de uma posição de acordo com um novo conjunto a ser incluso.
         """
-        self.follow_pose[value] = self.follow_pose[value].union(follow_pose)
+        self.follow_pose[value] |= follow_pose
     
-    def add_default_follow_pose(self, value:str):
+    def add_default_follow_pose(self, value: int):
         """
-        Adiciona um conjunto vazio padrão para cada estado do follow_pose
+        Adiciona um conjunto vazio padrão ao follow pos de cada posição, que são adicionadas em ordem.
         """
-        self.follow_pose[value] = set()
+        while len(self.follow_pose) <= value:
+            self.follow_pose.append(0)
     
     def calculate_nodes_data(self):
         """
         Calcula iterativamente firs pos, last pos, nullable e follow pos para cada um dos nós da árvore.
+        Ao final, particiona o alfabeto em classes de caracteres disjuntas.
         """
         for node in self.nodes:
 
             if node.left_node == None and node.right_node == None and not node.is_operator:
-                node.first_pose.add(node.value)
-                node.last_pose.add(node.value)
+                node.first_pose = 1 << node.value
+                node.last_pose = 1 << node.value
 
-                if node.token != "#":
-                    self.alphabet.add(node.token)
+                if node.value in self.acceptance_tokens:
+                    self.__acceptance_mask |= 1 << node.value
+                else:
+                    self.leaf_symbols[node.token] = []
 
             if node.token == "|" and node.is_operator:
                 node.nullable = node.left_node.nullable or node.right_node.nullable
-                node.first_pose = node.left_node.first_pose.union(node.right_node.first_pose)
-                node.last_pose = node.left_node.last_pose.union(node.right_node.last_pose)
+                node.first_pose = node.left_node.first_pose | node.right_node.first_pose
+                node.last_pose = node.left_node.last_pose | node.right_node.last_pose
             
-            if node.token == "*" and node.is_operator:
-                node.nullable = True
+            if node.token in ["*", "+", "?"] and node.is_operator:
+                node.nullable = node.token != "+" or node.left_node.nullable
                 node.first_pose = node.left_node.first_pose
                 node.last_pose = node.left_node.last_pose
 
@@ -91,109 +106,270 @@ class Tree:
                 node.nullable = node.left_node.nullable and node.right_node.nullable
                 
                 if node.left_node.nullable:
-                    node.first_pose = node.left_node.first_pose.union(node.right_node.first_pose)
+                    node.first_pose = node.left_node.first_pose | node.right_node.first_pose
                 else:
                     node.first_pose = node.left_node.first_pose
                 
                 if node.right_node.nullable:
-                    node.last_pose = node.left_node.last_pose.union(node.right_node.last_pose)
+                    node.last_pose = node.left_node.last_pose | node.right_node.last_pose
                 else:
                     node.last_pose = node.right_node.last_pose
                 
             if node.token == "&" and node.is_operator:
                 node.nullable = True
 
-            if node.token in ["*", "."] and node.is_operator:
+            if node.token in ["*", "+", "."] and node.is_operator:
                 self.calculate_node_follow_pose(node)
             
+        self.partition_alphabet()
+
+    def partition_alphabet(self):
+        """
+        Particiona os caracteres cobertos pelas folhas em classes de equivalência disjuntas,
+        que formam o alfabeto do AFD (uma coluna por classe em vez de uma por caractere).
+        Cada folha passa a referenciar as classes do alfabeto contidas em seu rótulo, e cada classe
+        passa a ter o conjunto das posições cujas folhas a contêm (ver symbol_positions).
+        """
+        labels = sorted(self.leaf_symbols)
+        partition, membership = partition_intervals([label_intervals(label) for label in labels])
+        partition_labels = [class_label(intervals) for intervals in partition]
+
+        self.__alphabet = set(partition_labels)
+        for label, classes in zip(labels, membership):
+            self.leaf_symbols[label] = [partition_labels[index] for index in classes]
+
+        self.__symbol_positions = {symbol: 0 for symbol in partition_labels}
+        for position, label in self.node_value_to_token.items():
+            if position not in self.acceptance_tokens:
+                for symbol in self.leaf_symbols[label]:
+                    self.__symbol_positions[symbol] |= 1 << position
+
     def calculate_node_follow_pose(self, node: Node):
         """
         Atualiza o follow_pose considerando o cálculo de um único nó.
         Este método é chamado iterativamente pelo anterior, buscando construir todo o follow_pose.
         """
-        if node.token == "*" and node.is_operator:
-            for value in node.last_pose:
+        if node.token in ["*", "+"] and node.is_operator:
+            for value in iterate_bits(node.last_pose):
                 self.update_follow_pose(value, node.first_pose)
     
         if node.token == "." and node.is_operator:
-            for value in node.left_node.last_pose:
+            for value in iterate_bits(node.left_node.last_pose):
                 self.update_follow_pose(value, node.right_node.first_pose)
     
-    def generate_automata(self, token_name: str) -> FiniteAutomata:
+    def copy_subtree(self, node: Node) -> Node:
         """
-        Considerando os dados de follow_pose já computados, gera e retorna o AFD correspondente.
+        Copia a subárvore de node, com novas posições nas folhas, adicionando os nós copiados à árvore em pós-ordem.
         """
-        format_states_name = dict()
-        initial_state = self.nodes[-1].first_pose
-        initial_state_name = self.format_automata_state_name(initial_state)
-        states = {initial_state_name}
-        final_states = set()
-        transitions = dict()
-        queue = [initial_state]
+        copies: Dict[int, Node] = {}  # id do nó original → cópia
+        stack = [(node, False)]
+        while stack:
+            current, visited = stack.pop()
+            if not visited:
+                stack.append((current, True))
+                stack.extend((child, False) for child in [current.right_node, current.left_node] if child is not None)
+                continue
 
-        name_counter = 0
+            if current.is_operator:
+                left_node = copies[id(current.left_node)] if current.left_node is not None else None
+                right_node = copies[id(current.right_node)] if current.right_node is not None else None
+                copy = Node(current.token, left_node, right_node)
+            else:
+                position = len(self.follow_pose)
+                copy = Node(current.token, value=position, operator=False)
+                self.node_value_to_token[position] = current.token
+            copies[id(current)] = copy
+            self.add_node(copy)
 
-        while len(queue) != 0:
-            current_state = queue.pop(0)
-            current_state_name = self.format_automata_state_name(current_state)
-            format_states_name[current_state_name] = token_name + "_q" + str(name_counter)
-            name_counter += 1
+        return copies[id(node)]
 
-            for character in self.alphabet:
+    def repeat(self, node: Node, minimum: int, maximum: Optional[int]) -> Node:
+        """
+        Monta a repetição limitada node{minimum,maximum} (maximum None: ilimitada) a partir de cópias da subárvore,
+        já que cada ocorrência precisa de posições próprias: minimum cópias obrigatórias seguidas de
+        maximum - minimum cópias opcionais (?), ou com a última cópia repetida (+ ou *) quando ilimitada.
+        Os nós criados são adicionados à árvore após os de node. Retorna a raiz da repetição.
+        """
+        copies_count = max(minimum, 1) if maximum is None else maximum
+        if copies_count == 0:
+            empty = Node("&")
+            self.add_node(empty)
+            return empty
 
-                if self.acceptance_node.value in current_state: 
-                    final_states.add(current_state_name)
+        copies = [node] + [self.copy_subtree(node) for _ in range(copies_count - 1)]
+        parts = []
+        for index, copy in enumerate(copies):
+            if maximum is None and index == copies_count - 1:
+                copy = Node("+" if minimum > 0 else "*", copy)
+                self.add_node(copy)
+            elif index >= minimum:
+                copy = Node("?", copy)
+                self.add_node(copy)
+            parts.append(copy)
 
-                next_state = set()
-                for node_value in current_state:
-                    node_token = self.node_value_to_token[node_value]
+        root = parts[0]
+        for part in parts[1:]:
+            root = Node(".", root, part)
+            self.add_node(root)
+        return root
 
-                    if node_token == character:
-                        next_state = next_state.union(self.follow_pose[node_value])
-                                                                        
-                if len(next_state) == 0:
-                    continue
-                
-                next_state_name = self.format_automata_state_name(next_state)
-                if next_state_name not in states:
-                    states.add(next_state_name)
-                    queue.append(next_state)
-                
-                transitions[(current_state_name, character)] = next_state_name
+    def compact(self) -> "Tree":
+        """
+        Retorna uma cópia da árvore, já calculada, apenas com os dados das posições (follow pos, rótulos das folhas
+        e marcadores de fim) e uma raiz sem filhos com o seu first pos: o suficiente para union e generate_automata,
+        sem guardar os nós internos. Usada como artefato compilado de cada definição no cache do analisador léxico.
+        """
+        tree = Tree()
+        root = Node("|")
+        root.first_pose = self.nodes[-1].first_pose
+        tree.nodes.append(root)
+        tree.follow_pose[:] = self.follow_pose
+        tree.node_value_to_token.update(self.node_value_to_token)
+        tree.acceptance_tokens.update(self.acceptance_tokens)
+        tree.__acceptance_mask = self.__acceptance_mask
+        tree.__alphabet = set(self.alphabet)
+        tree.__leaf_symbols = dict(self.leaf_symbols)
+        tree.__symbol_positions = dict(self.symbol_positions)
+        return tree
 
-        initial_state = format_states_name[initial_state_name]
+    @staticmethod
+    def union(trees: List["Tree"]) -> "Tree":
+        """
+        Retorna a árvore (compacta) da união (t1 | t2 | ... | tn) de árvores já calculadas,
+        deslocando as posições de cada árvore para depois das posições das anteriores.
+        Como a união não cria novos pares de follow pos, o follow pos de cada posição é o da sua árvore, deslocado;
+        o first pos da raiz é a união dos first pos das raízes. Ao final, reparticiona o alfabeto comum.
+        O resultado é o mesmo de montar e calcular uma única árvore para (t1 | t2 | ... | tn).
+        """
+        tree = Tree()
+        root = Node("|")
+        tree.nodes.append(root)
+        for other in trees:
+            offset = len(tree.follow_pose) - 1
+            tree.follow_pose.extend(follow << offset for follow in other.follow_pose[1:])
+            tree.node_value_to_token.update((value + offset, label) for value, label in other.node_value_to_token.items())
+            tree.acceptance_tokens.update((value + offset, token) for value, token in other.acceptance_tokens.items())
+            tree.__acceptance_mask |= other.__acceptance_mask << offset
+            tree.leaf_symbols.update(dict.fromkeys(other.leaf_symbols, []))
+            root.first_pose |= other.nodes[-1].first_pose << offset
 
-        states = list(states)
-        for state in states[:]:
-            states.remove(state)
-            states.append(format_states_name[state])
-        states = set(states)
+        tree.partition_alphabet()
+        return tree
 
-        final_states = list(final_states)
-        for state in final_states[:]:
-            final_states.remove(state)
-            final_states.append(format_states_name[state])
-        final_states = set(final_states)
+    @staticmethod
+    def trie(literals: List[Tuple[str, str]]) -> "Tree":
+        """
+        Retorna a árvore (compacta) equivalente à união (w1#1 | w2#2 | ... | wn#n) de palavras literais (token, palavra),
+        montada diretamente como uma trie, sem análise das expressões: cada nó da trie é uma posição rotulada pelo
+        caractere da aresta que chega a ele, e o seu follow pos são os seus filhos e o marcador de fim de cada token
+        cuja palavra termina nele. Os prefixos comuns compartilham posições, de modo que a árvore tem uma posição
+        por nó da trie (mais um marcador por palavra), podendo ser unida às demais árvores com union.
+        """
+        tree = Tree()
+        root = Node("|")
+        tree.nodes.append(root)
+        children: Dict[Tuple[int, str], int] = {}  # (posição, caractere) → posição do filho; a raiz é a posição 0
 
-        new_transitions = dict()
-        for state, alphabet_character in transitions:
-            new_transitions[(format_states_name[state], alphabet_character)] = {format_states_name[transitions[(state, alphabet_character)]]}
+        def add_position(parent: int, label: str) -> int:
+            position = len(tree.follow_pose)
+            tree.follow_pose.append(0)
+            tree.node_value_to_token[position] = label
+            if parent:
+                tree.follow_pose[parent] |= 1 << position
+            else:
+                root.first_pose |= 1 << position
+            return position
 
-        return FiniteAutomata(states, self.alphabet, initial_state, final_states, new_transitions)
-        
-    def format_automata_state_name(self, name: set):
+        for token, word in literals:
+            position = 0
+            for character in word:
+                child = children.get((position, character))
+                if child is None:
+                    child = add_position(position, character)
+                    children[(position, character)] = child
+                    tree.leaf_symbols[character] = []
+                position = child
+            marker = add_position(position, "#")
+            tree.acceptance_tokens[marker] = token
+            tree.__acceptance_mask |= 1 << marker
+
+        tree.partition_alphabet()
+        return tree
+
+    def generate_automata(self, token_priority: List[str] = None) -> FiniteAutomata:
         """
-        Formata o nome de um determinado estado para convenção q0, q1, ... utilizada.
+        Considerando os dados de follow_pose já computados, gera e retorna o AFD correspondente.
+        Um estado é final se contém algum marcador de fim (#); quando contém marcadores de mais de um token,
+        é associado ao token de maior prioridade (o que aparece primeiro em token_priority).
+        Os estados são conjuntos de posições (máscaras), numerados (0, 1, ...) na ordem em que são descobertos.
+        O destino por um símbolo é a união do follow pos das posições do estado que contêm o símbolo
+        (estado & symbol_positions[símbolo]), memoizada por conjunto de posições.
         """
-        state = map(int, list(name))
-        state = sorted(state)
-        state = map(str, state)
-        return "".join(state)
+        token_rank = {token: index for index, token in reversed(list(enumerate(token_priority or [])))}
+        symbol_positions = sorted(self.symbol_positions.items())
+        follow_pose = self.follow_pose
+        follow_of: Dict[int, int] = {}
+        non_acceptance_mask = ~self.__acceptance_mask
+        position_symbols = [
+            self.leaf_symbols[self.node_value_to_token[value]] if value in self.node_value_to_token and value not in self.acceptance_tokens else []
+            for value in range(len(follow_pose))
+        ]
+
+        initial_state = self.nodes[-1].first_pose
+        state_ids = {initial_state: 0}
+        final_states = set()
+        final_state_to_token = dict()
+        transitions = dict()
+        queue = deque([initial_state])
+
+        while queue:
+            current_state = queue.popleft()
+            current_state_id = state_ids[current_state]
+
+            accepting = current_state & self.__acceptance_mask
+            if accepting:
+                accepted_tokens = [self.acceptance_tokens[value] for value in iterate_bits(accepting)]
+                final_states.add(current_state_id)
+                final_state_to_token[current_state_id] = min(accepted_tokens, key=lambda token: token_rank.get(token, len(token_rank)))
+
+            # Estados com poucas posições unem diretamente o follow pos de cada posição nos símbolos que ela contém;
+            # os demais usam o índice de símbolos, com a união memoizada por conjunto de posições
+            if current_state.bit_count() < len(symbol_positions):
+                next_states: Dict[str, int] = {}
+                for value in iterate_bits(current_state & non_acceptance_mask):
+                    follow = follow_pose[value]
+                    for character in position_symbols[value]:
+                        next_states[character] = next_states.get(character, 0) | follow
+            else:
+                next_states = {}
+                for character, positions in symbol_positions:
+                    positions &= current_state
+                    if positions:
+                        next_state = follow_of.get(positions)
+                        if next_state is None:
+                            next_state = 0
+                            for value in iterate_bits(positions):
+                                next_state |= follow_pose[value]
+                            follow_of[positions] = next_state
+                        next_states[character] = next_state
+
+            for character, next_state in next_states.items():
+                if not next_state:
+                    continue
+
+                if next_state not in state_ids:
+                    state_ids[next_state] = len(state_ids)
+                    queue.append(next_state)
+
+                transitions[(current_state_id, character)] = {state_ids[next_state]}
+
+        automata = FiniteAutomata(set(state_ids.values()), self.alphabet, 0, final_states, transitions)
+        automata.final_state_to_token = final_state_to_token
+        return automata
             
     def __str__(self):
         text = ""
         for node in self.nodes:
-            text += f"Token: {node.token}, Value: {node.value}, First Pose: {node.first_pose}, Last pose: {node.last_pose}, Nullable: {node.nullable}\n"
+            text += f"Token: {node.token}, Value: {node.value}, First Pose: {bin(node.first_pose)}, Last pose: {bin(node.last_pose)}, Nullable: {node.nullable}\n"
         
         return text
-                
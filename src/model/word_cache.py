@@ -0,0 +1,66 @@
+from collections import OrderedDict
+from typing import Tuple
+
+
+class WordCache:
+    """
+    Classe que representa um cache de memoização do reconhecimento de palavras inteiras pelo autômato do analisador léxico.
+    Mapeia cada palavra ao resultado de run (aceita, token), de modo que palavras repetidas (identificadores,
+    palavras reservadas, operadores) custam uma consulta a um dicionário em vez da execução do autômato.
+    O cache é limitado a max_words palavras, com política LRU, e é esvaziado sempre que o autômato associado muda.
+    """
+
+    def __init__(self, max_words: int = 65536):
+        if max_words < 1:
+            raise ValueError("O cache de palavras deve comportar ao menos uma palavra")
+        self.__results: OrderedDict[str, Tuple[bool, str]] = OrderedDict()
+        self.__automata = None
+        self.max_words: int = max_words
+        self.hits: int = 0
+        self.misses: int = 0
+        self.evictions: int = 0
+
+    def bind(self, automata):
+        """
+        Associa o cache ao autômato (compilado ou preguiçoso) usado para reconhecer as palavras,
+        invalidando os resultados guardados caso seja diferente do autômato atual.
+        """
+        if automata is not self.__automata:
+            self.clear()
+            self.__automata = automata
+
+    def run(self, word: str) -> Tuple[bool, str]:
+        """
+        Retorna o resultado de run do autômato associado para a palavra, executando-o apenas na primeira ocorrência.
+        """
+        result = self.__results.get(word)
+        if result is not None:
+            self.hits += 1
+            self.__results.move_to_end(word)
+            return result
+
+        self.misses += 1
+        result = self.__automata.run(word)
+        self.__results[word] = result
+        if len(self.__results) > self.max_words:
+            self.__results.popitem(last=False)
+            self.evictions += 1
+        return result
+
+    def clear(self):
+        """
+        Esvazia o cache e zera os contadores.
+        """
+        self.__results.clear()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    @property
+    def cached_words_count(self):
+        return len(self.__results)
@@ -0,0 +1,134 @@
+from bisect import bisect_left
+from typing import Dict, FrozenSet, Iterable, Iterator, List, Tuple
+
+"""
+Utilitários para classes de caracteres representadas como intervalos de code points.
+Uma classe é uma tupla ordenada de intervalos fechados e disjuntos, como ((48, 57), (65, 90)) para [0-9A-Z].
+Cada classe possui um rótulo textual, usado como símbolo do alfabeto dos autômatos:
+classes de um único caractere são rotuladas pelo próprio caractere, e as demais no formato [0-9A-Z].
+"""
+Intervals = Tuple[Tuple[int, int], ...]
+
+# Caracteres escapados com \ dentro do rótulo de uma classe
+ESCAPED_CLASS_CHARS = {"\\", "[", "]", "-"}
+
+
+def normalize_intervals(intervals: Iterable[Tuple[int, int]]) -> Intervals:
+    """
+    Ordena e une intervalos sobrepostos ou adjacentes, retornando a forma canônica da classe.
+    """
+    merged: List[List[int]] = []
+    for start, end in sorted(intervals):
+        if merged and start <= merged[-1][1] + 1:
+            merged[-1][1] = max(merged[-1][1], end)
+        else:
+            merged.append([start, end])
+    return tuple((start, end) for start, end in merged)
+
+
+def class_label(intervals: Intervals) -> str:
+    """
+    Retorna o rótulo textual de uma classe: o próprio caractere, se a classe tiver um único caractere,
+    ou a classe no formato [a-z0-9_], escapando \\, [, ], - e representando o espaço como \\s.
+    """
+    if len(intervals) == 1 and intervals[0][0] == intervals[0][1]:
+        return chr(intervals[0][0])
+
+    def _escape(code: int) -> str:
+        char = chr(code)
+        if char == " ":
+            return "\\s"
+        return f"\\{char}" if char in ESCAPED_CLASS_CHARS else char
+
+    parts = []
+    for start, end in intervals:
+        if start == end:
+            parts.append(_escape(start))
+        elif end == start + 1:
+            parts.append(_escape(start) + _escape(end))
+        else:
+            parts.append(f"{_escape(start)}-{_escape(end)}")
+    return f"[{''.join(parts)}]"
+
+
+def label_intervals(label: str) -> Intervals:
+    """
+    Operação inversa de class_label: converte o rótulo de um símbolo do alfabeto na classe correspondente.
+    """
+    if len(label) == 1:
+        return ((ord(label), ord(label)),)
+    if not (label.startswith("[") and label.endswith("]")):
+        raise ValueError(f"Símbolo de alfabeto inválido: {label}")
+
+    chars: List[str] = []
+    is_range: List[bool] = []
+    index = 1
+    while index < len(label) - 1:
+        char = label[index]
+        if char == "\\":
+            index += 1
+            char = " " if label[index] == "s" else label[index]
+            chars.append(char)
+            is_range.append(False)
+        elif char == "-":
+            is_range[-1] = True
+        else:
+            chars.append(char)
+            is_range.append(False)
+        index += 1
+
+    intervals = []
+    index = 0
+    while index < len(chars):
+        if is_range[index]:
+            intervals.append((ord(chars[index]), ord(chars[index + 1])))
+            index += 2
+        else:
+            intervals.append((ord(chars[index]), ord(chars[index])))
+            index += 1
+    return normalize_intervals(intervals)
+
+
+def expand_intervals(intervals: Intervals) -> Iterator[str]:
+    """
+    Itera por todos os caracteres contidos em uma classe.
+    """
+    for start, end in intervals:
+        for code in range(start, end + 1):
+            yield chr(code)
+
+
+def partition_intervals(classes: List[Intervals]) -> Tuple[List[Intervals], List[List[int]]]:
+    """
+    Particiona o conjunto de caracteres coberto pelas classes de entrada em classes de equivalência disjuntas:
+    dois caracteres ficam na mesma classe se e somente se pertencem exatamente às mesmas classes de entrada.
+    Retorna a partição (ordenada pelo primeiro caractere de cada classe) e, para cada classe de entrada,
+    os índices das classes da partição contidas nela.
+    """
+    boundaries = sorted(
+        {start for intervals in classes for start, _ in intervals} |
+        {end + 1 for intervals in classes for _, end in intervals}
+    )
+
+    # Segmentos elementares [boundaries[i], boundaries[i + 1] - 1], e as classes de entrada que contêm cada um
+    segment_members: List[List[int]] = [[] for _ in range(max(len(boundaries) - 1, 0))]
+    for class_index, intervals in enumerate(classes):
+        for start, end in intervals:
+            for segment in range(bisect_left(boundaries, start), bisect_left(boundaries, end + 1)):
+                segment_members[segment].append(class_index)
+
+    # Agrupa os segmentos pela assinatura (conjunto de classes de entrada que os contêm)
+    groups: Dict[FrozenSet[int], List[Tuple[int, int]]] = {}
+    for segment, members in enumerate(segment_members):
+        if members:
+            signature = frozenset(members)
+            groups.setdefault(signature, []).append((boundaries[segment], boundaries[segment + 1] - 1))
+
+    ordered = sorted(groups.items(), key=lambda item: item[1][0])
+    partition = [normalize_intervals(intervals) for _, intervals in ordered]
+    membership: List[List[int]] = [[] for _ in classes]
+    for partition_index, (signature, _) in enumerate(ordered):
+        for class_index in signature:
+            membership[class_index].append(partition_index)
+
+    return partition, membership
@@ -0,0 +1,108 @@
+import hashlib
+import os
+import pickle
+from pathlib import Path
+from typing import Any, List, Optional
+
+from src.utils.paths import LEXER_CACHE_DIR
+
+"""
+Utilitários para o cache em disco do analisador léxico compilado.
+Cada entrada é indexada pelo hash do conteúdo do arquivo de definições regulares, do modo de construção
+e da versão do compilador, de modo que alterações no arquivo ou no processo de compilação invalidam o cache.
+Além do analisador completo, o cache guarda o artefato compilado de cada definição regular (em DEFINITIONS_DIR),
+indexado pelo hash do seu texto resolvido, permitindo recompilar apenas as definições alteradas.
+"""
+
+# Versão do processo de compilação das definições regulares. Deve ser incrementada sempre que
+# a construção do autômato mudar de forma que invalide entradas antigas do cache.
+COMPILER_VERSION = "5"
+
+# Subdiretório do cache com os artefatos compilados de cada definição regular
+DEFINITIONS_DIR = LEXER_CACHE_DIR / "definitions"
+
+
+def cache_key(regular_definitions_file: Path, construction_mode: str) -> str:
+    """
+    Retorna a chave do cache para um arquivo de definições regulares:
+    o hash SHA-256 do seu conteúdo, do modo de construção e da versão do compilador.
+    """
+    digest = hashlib.sha256()
+    digest.update(f"{COMPILER_VERSION}:{construction_mode}:".encode("utf-8"))
+    with open(regular_definitions_file, "rb") as file:
+        digest.update(file.read())
+    return digest.hexdigest()
+
+
+def definition_key(token: str, regular_expression: str, dependency_keys: List[str], construction_mode: str) -> str:
+    """
+    Retorna a chave do cache para o artefato compilado de uma definição regular: o hash SHA-256 do nome do token,
+    do texto da expressão, das chaves das definições que ela referencia (na ordem das referências),
+    do modo de construção e da versão do compilador. Como as chaves das referências dependem, por sua vez,
+    do texto delas, a chave corresponde ao hash do texto resolvido da definição: alterar uma definição
+    muda a chave dela e a de todas as que dependem dela, e apenas delas.
+    """
+    digest = hashlib.sha256()
+    digest.update(f"{COMPILER_VERSION}:{construction_mode}:{len(token)}:{token}:".encode("utf-8"))
+    digest.update(regular_expression.encode("utf-8"))
+    for dependency_key in dependency_keys:
+        digest.update(f":{dependency_key}".encode("utf-8"))
+    return digest.hexdigest()
+
+
+def load_compiled_lexer(key: str) -> Optional[dict]:
+    """
+    Carrega a entrada do cache correspondente à chave, ou retorna None caso ela não exista
+    ou não possa ser lida (ex: arquivo corrompido ou gerado por outra versão).
+    """
+    return _load_entry(LEXER_CACHE_DIR / f"{key}.pickle")
+
+
+def load_definition_artifact(key: str) -> Optional[Any]:
+    """
+    Carrega o artefato compilado de uma definição regular, ou retorna None caso não exista entrada válida para a chave.
+    """
+    entry = _load_entry(DEFINITIONS_DIR / f"{key}.pickle")
+    return entry["artifact"] if entry is not None else None
+
+
+def _load_entry(cache_file: Path) -> Optional[dict]:
+    if not cache_file.exists():
+        return None
+    try:
+        with open(cache_file, "rb") as file:
+            entry = pickle.load(file)
+    except Exception:
+        # Qualquer falha de leitura (protocolo desconhecido, bytes inválidos, classes removidas) equivale a uma falta
+        return None
+    if not isinstance(entry, dict) or entry.get("compiler_version") != COMPILER_VERSION:
+        return None
+    return entry
+
+
+def store_compiled_lexer(key: str, entry: dict):
+    """
+    Salva uma entrada no cache, de forma atômica (escrita em arquivo temporário seguida de renomeação).
+    Falhas de escrita são ignoradas, pois o cache é apenas uma otimização.
+    """
+    _store_entry(LEXER_CACHE_DIR, key, entry)
+
+
+def store_definition_artifact(key: str, artifact: Any):
+    """
+    Salva o artefato compilado de uma definição regular no cache (ver store_compiled_lexer).
+    """
+    _store_entry(DEFINITIONS_DIR, key, {"artifact": artifact})
+
+
+def _store_entry(cache_dir: Path, key: str, entry: dict):
+    entry = dict(entry, compiler_version=COMPILER_VERSION)
+    cache_file = cache_dir / f"{key}.pickle"
+    temp_file = cache_dir / f"{key}.{os.getpid()}.tmp"
+    try:
+        cache_dir.mkdir(parents=True, exist_ok=True)
+        with open(temp_file, "wb") as file:
+            pickle.dump(entry, file, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(temp_file, cache_file)
+    except OSError:
+        temp_file.unlink(missing_ok=True)
@@ -0,0 +1,81 @@
+from typing import Any, Callable, Hashable, Iterator, Optional, Sequence, Tuple
+
+"""
+Utilitários para a análise de texto bruto com a semântica de maior casamento (maximal munch), compartilhados
+pelos scanners de CompiledAutomata (sobre texto e sobre bytes) e de LazyAutomata. Cada autômato fornece apenas
+como decodificar um elemento da entrada em símbolo e como avançar de estado; o laço de maior casamento,
+a recuperação de erros e o tratamento de final (texto recebido em partes) ficam em um único lugar.
+"""
+
+
+def scan_maximal_munch(
+    text: Sequence,
+    start: int,
+    end: Optional[int],
+    final: bool,
+    initial_state: int,
+    dead_state: int,
+    decode: Callable[[Any], Optional[Hashable]],
+    step: Callable[[int, Hashable], int],
+    accept_token: Callable[[int], Optional[str]],
+    is_whitespace: Callable[[Any], bool],
+    can_start: Callable[[int], bool] = None
+) -> Iterator[Tuple[int, int, Optional[str]]]:
+    """
+    Percorre text[start:end], gerando tuplas (início, fim, token) para cada lexema reconhecido.
+    decode retorna o símbolo de um elemento da entrada (ou None, se não pertence ao alfabeto), step o estado alcançado
+    a partir de um estado por um símbolo (dead_state se não houver transição) e accept_token o token aceito por um
+    estado (None se não final). Guarda o último estado de aceitação visto, de modo que o token retornado é o do
+    maior prefixo aceito. Elementos para os quais is_whitespace é verdadeiro e que não iniciam nenhum token
+    são ignorados entre lexemas.
+    Em caso de erro, gera (início, fim, None) agrupando os elementos não reconhecidos até o próximo espaço em branco
+    ou posição em que can_start é verdadeiro (por padrão, elemento com transição a partir do estado inicial).
+    Com final=False (texto recebido em partes), a análise para, sem gerar o registro, no primeiro lexema
+    ou erro que alcance o fim do trecho sem estar concluído: ele deve ser analisado novamente a partir do seu
+    início quando houver mais texto.
+    """
+    if can_start is None:
+        def can_start(position: int) -> bool:
+            symbol = decode(text[position])
+            return symbol is not None and step(initial_state, symbol) != dead_state
+
+    end = len(text) if end is None else end
+    position = start
+
+    while position < end:
+        state = initial_state
+        last_accept_end = position
+        last_accept_token = None
+        index = position
+
+        while index < end:
+            symbol = decode(text[index])
+            if symbol is None:
+                break
+            state = step(state, symbol)
+            if state == dead_state:
+                break
+            index += 1
+            token = accept_token(state)
+            if token is not None:
+                last_accept_end = index
+                last_accept_token = token
+
+        if not final and index == end:
+            return
+        if last_accept_end > position:
+            yield (position, last_accept_end, last_accept_token)
+            position = last_accept_end
+        elif is_whitespace(text[position]):
+            position += 1
+        else:
+            # Recuperação de erro: avança até um ponto de ressincronização
+            error_start = position
+            position += 1
+            while position < end and not is_whitespace(text[position]):
+                if can_start(position):
+                    break
+                position += 1
+            if not final and position == end:
+                return
+            yield (error_start, position, None)
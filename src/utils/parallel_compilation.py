@@ -0,0 +1,53 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import List
+
+from src.model.finite_automata import FiniteAutomata
+from src.model.regular_expression import RegularExpression
+from src.model.tree import Tree
+
+"""
+Utilitários para a compilação das definições regulares por um conjunto de processos.
+As expressões são analisadas no processo principal (a análise é rápida e depende das definições referenciadas),
+e cada processo recebe apenas a notação pós-fixa de uma definição, montando a sua árvore, calculando o followpos
+e, na união dos autômatos, gerando o AFD do token. Os artefatos retornam na ordem das definições,
+de modo que o autômato geral é o mesmo da compilação sequencial.
+"""
+
+# Especificações com notações pós-fixas menores que isso (somadas) são compiladas sequencialmente, no próprio processo
+MIN_PARALLEL_SIZE = 1 << 14
+
+
+def compile_definition(postfix: list, construction_mode: str) -> Tree | FiniteAutomata:
+    """
+    Compila a notação pós-fixa de uma definição (com o marcador de fim): retorna a árvore já calculada, compacta,
+    na construção direta ("direct"), ou o AFD do token, na união dos autômatos ("union").
+    """
+    tree = RegularExpression.convert_postfix_to_tree(postfix)
+    tree.calculate_nodes_data()
+    return tree.compact() if construction_mode == "direct" else tree.generate_automata()
+
+
+def compile_definitions_in_parallel(
+    postfixes: List[list],
+    construction_mode: str,
+    workers: int = None
+) -> List[Tree | FiniteAutomata]:
+    """
+    Compila as notações pós-fixas com um conjunto de workers processos (por padrão, um por CPU),
+    retornando os artefatos na mesma ordem (ver compile_definition).
+    Especificações pequenas são compiladas sequencialmente, sem criar processos.
+    """
+    workers = workers or os.cpu_count() or 1
+    if workers == 1 or len(postfixes) < 2 or sum(len(postfix) for postfix in postfixes) < MIN_PARALLEL_SIZE:
+        return [compile_definition(postfix, construction_mode) for postfix in postfixes]
+
+    # Várias definições por tarefa, para diluir o custo de comunicação entre os processos
+    chunksize = max(1, len(postfixes) // (workers * 4))
+    with ProcessPoolExecutor(min(workers, len(postfixes))) as executor:
+        return list(executor.map(
+            compile_definition,
+            postfixes,
+            [construction_mode] * len(postfixes),
+            chunksize=chunksize
+        ))
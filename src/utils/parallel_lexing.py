@@ -0,0 +1,215 @@
+import mmap
+import os
+import re
+from array import array
+from bisect import bisect_left
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from src.model.compiled_automata import CompiledAutomata
+from src.model.token_stream import TokenStream
+
+"""
+Utilitários para a análise léxica paralela de um arquivo, dividido em faixas de bytes processadas
+por um conjunto de processos. Cada processo recebe o AFD sobre bytes (ver CompiledAutomata.utf8_automata)
+uma única vez, na sua inicialização, mapeia o arquivo em memória e analisa apenas a sua faixa.
+As faixas começam em espaços em branco (ou no início de uma linha, no modo de uma palavra por linha).
+No modo de maior casamento, em que um lexema pode atravessar o limite de uma faixa, os resultados são
+ressincronizados na junção: os tokens de uma faixa são aproveitados a partir do primeiro token que começa
+na mesma posição que a análise sequencial, reanalisando o trecho intermediário quando necessário.
+"""
+
+# Arquivos menores que isso são analisados sequencialmente, no próprio processo
+MIN_PARALLEL_SIZE = 1 << 20
+
+# Resultado da análise de uma faixa: ids dos tokens, posições de início e de fim, e a posição do primeiro
+# token após a faixa (apenas no modo de maior casamento; -1 caso a análise alcance o fim do arquivo)
+RangeResult = Tuple[array, array, array, int]
+
+_WORD_PATTERN = re.compile(rb"\S+")
+_WHITESPACE_PATTERN = re.compile(rb"\s")
+_LINE_PATTERN = re.compile(rb"[^\n]*\n|[^\n]+")
+
+# Estado de cada processo do conjunto, definido uma única vez por _init_worker
+_worker_automata: CompiledAutomata = None
+_worker_token_ids: Dict[Optional[str], int] = None
+
+
+def _init_worker(automata: CompiledAutomata, token_ids: Dict[Optional[str], int]):
+    global _worker_automata, _worker_token_ids
+    _worker_automata = automata
+    _worker_token_ids = token_ids
+
+
+def _lex_range_in_worker(file_path: Path, start: int, end: int, ignore_whitespaces: bool, maximal_munch: bool) -> RangeResult:
+    with open(file_path, "rb") as file:
+        data = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+    return lex_range(_worker_automata, _worker_token_ids, data, start, end, ignore_whitespaces, maximal_munch)
+
+
+def lex_range(
+    automata: CompiledAutomata,
+    token_ids: Dict[Optional[str], int],
+    data,
+    start: int,
+    end: int,
+    ignore_whitespaces: bool,
+    maximal_munch: bool
+) -> RangeResult:
+    """
+    Analisa a faixa [start, end) dos bytes com o AFD sobre bytes, com a mesma separação de palavras de
+    LexicalAnalyzer. token_ids mapeia cada token (e None, para lexemas não reconhecidos) para o seu id.
+    No modo de maior casamento, os tokens que começam na faixa podem terminar depois dela.
+    """
+    ids, starts, ends = array("I"), array("Q"), array("Q")
+    next_start = -1
+
+    if maximal_munch:
+        for token_start, token_end, token in automata.scan_bytes(data, start):
+            if token_start >= end:
+                next_start = token_start
+                break
+            ids.append(token_ids[token])
+            starts.append(token_start)
+            ends.append(token_end)
+        return ids, starts, ends, next_start
+
+    view = memoryview(data)
+    if ignore_whitespaces:
+        spans = (match.span() for match in _WORD_PATTERN.finditer(data, start, end))
+    else:
+        spans = (_strip_line(data, match.start(), match.end()) for match in _LINE_PATTERN.finditer(data, start, end))
+    for word_start, word_end in spans:
+        accepted, token = automata.run(view[word_start:word_end])
+        ids.append(token_ids[token if accepted else None])
+        starts.append(word_start)
+        ends.append(word_end)
+    return ids, starts, ends, next_start
+
+
+def _strip_line(data, start: int, end: int) -> Tuple[int, int]:
+    """
+    Retorna as posições da linha [start, end), sem a quebra de linha e os espaços em branco (ASCII) das extremidades.
+    """
+    whitespace = CompiledAutomata.WHITESPACE_BYTES
+    if end > start and data[end - 1] == ord("\n"):
+        end -= 1
+    while start < end and data[start] in whitespace:
+        start += 1
+    while end > start and data[end - 1] in whitespace:
+        end -= 1
+    return start, end
+
+
+def split_ranges(data, ranges_count: int, at_line_starts: bool) -> List[Tuple[int, int]]:
+    """
+    Divide os bytes em até ranges_count faixas de tamanho semelhante, iniciadas em limites seguros:
+    logo após uma quebra de linha, com at_line_starts (modo de uma palavra por linha), ou em um espaço em branco.
+    """
+    size = len(data)
+    boundaries = [0]
+    for index in range(1, ranges_count):
+        position = max(size * index // ranges_count, boundaries[-1])
+        if not at_line_starts:
+            match = _WHITESPACE_PATTERN.search(data, position)
+            position = match.start() if match else size
+        else:
+            position = data.find(b"\n", position)
+            position = position + 1 if position != -1 else size
+        if position > boundaries[-1]:
+            boundaries.append(position)
+    if boundaries[-1] < size:
+        boundaries.append(size)
+    return list(zip(boundaries, boundaries[1:]))
+
+
+def _merge_maximal_munch(
+    automata: CompiledAutomata,
+    token_ids: Dict[Optional[str], int],
+    data,
+    ranges: List[Tuple[int, int]],
+    results: List[RangeResult],
+    tokens: TokenStream
+):
+    """
+    Junta os resultados das faixas no modo de maior casamento. next_start é a posição em que a análise
+    sequencial iniciaria o próximo token; como a análise a partir de uma posição não depende do que veio antes,
+    os tokens de uma faixa são válidos a partir do primeiro que começa em uma posição alcançada pela análise sequencial.
+    """
+    next_start = 0
+    for (_, range_end), (ids, starts, ends, range_next_start) in zip(ranges, results):
+        if next_start == -1:
+            return
+        if next_start >= range_end:
+            continue
+
+        # Reanalisa sequencialmente a partir de next_start até sincronizar com os tokens da faixa
+        index = bisect_left(starts, next_start)
+        while index == len(starts) or starts[index] != next_start:
+            scanned = next(automata.scan_bytes(data, next_start), None)
+            if scanned is None:
+                return
+            token_start, token_end, token = scanned
+            next_start = token_start
+            index = bisect_left(starts, next_start)
+            if next_start >= range_end or (index < len(starts) and starts[index] == next_start):
+                break
+            tokens.extend(array("I", [token_ids[token]]), array("Q", [token_start]), array("Q", [token_end]))
+            next_start = token_end
+            index = bisect_left(starts, next_start)
+
+        if next_start >= range_end:
+            continue
+        tokens.extend(ids[index:], starts[index:], ends[index:])
+        next_start = range_next_start
+
+
+def lex_file_in_parallel(
+    compiled_automata: CompiledAutomata,
+    file_path: Path,
+    ignore_whitespaces: bool,
+    maximal_munch: bool,
+    error_token: str,
+    workers: int = None
+) -> TokenStream:
+    """
+    Analisa o arquivo com um conjunto de workers processos (por padrão, um por CPU), retornando o fluxo de tokens,
+    em ordem, com posições em bytes sobre o arquivo mapeado em memória. Lexemas não reconhecidos recebem error_token.
+    Arquivos pequenos são analisados sequencialmente, sem criar processos.
+    """
+    automata = compiled_automata.utf8_automata()
+    token_names = [error_token] + sorted({token for token in automata.accept_tokens if token is not None})
+    token_ids: Dict[Optional[str], int] = {token: index for index, token in enumerate(token_names)}
+    token_ids[None] = 0
+
+    with open(file_path, "rb") as file:
+        if os.fstat(file.fileno()).st_size == 0:
+            return TokenStream(bytes(), token_names)
+        data = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+
+    workers = workers or os.cpu_count() or 1
+    tokens = TokenStream(data, token_names)
+    if workers == 1 or len(data) < MIN_PARALLEL_SIZE:
+        ids, starts, ends, _ = lex_range(automata, token_ids, data, 0, len(data), ignore_whitespaces, maximal_munch)
+        tokens.extend(ids, starts, ends)
+        return tokens
+
+    # Mais faixas que processos, para equilibrar a carga entre eles
+    ranges = split_ranges(data, workers * 4, not maximal_munch and not ignore_whitespaces)
+    with ProcessPoolExecutor(workers, initializer=_init_worker, initargs=(automata, token_ids)) as executor:
+        results = list(executor.map(
+            _lex_range_in_worker,
+            [file_path] * len(ranges),
+            [start for start, _ in ranges],
+            [end for _, end in ranges],
+            [ignore_whitespaces] * len(ranges),
+            [maximal_munch] * len(ranges)
+        ))
+
+    if maximal_munch:
+        _merge_maximal_munch(automata, token_ids, data, ranges, results, tokens)
+    else:
+        for ids, starts, ends, _ in results:
+            tokens.extend(ids, starts, ends)
+    return tokens
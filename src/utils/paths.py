@@ -9,6 +9,7 @@ LEXICAL_ANALYZER_INPUT_DIR = PROGRAM_DIR / "src/data/input_lexical_analyzer"
 SINTATICAL_ANALYZER_INPUT_DIR = PROGRAM_DIR / "src/data/input_sintatical_analyzer"
 REGULAR_DEFINITIONS_INPUT_DIR = PROGRAM_DIR / "src/data/input_regular_definitions" 
 FA_OUTPUT_DIR = PROGRAM_DIR / "src/data/output_af"
+LEXER_CACHE_DIR = PROGRAM_DIR / "src/data/cache_lexer"
 LEXICAL_ANALYZER_OUTPUT_DIR = PROGRAM_DIR / "src/data/output_lexical_analyzer"
 AUTOMATA_DIAGRAM_DIR = PROGRAM_DIR / "src/data/output_automata_diagram"
 SLR_TABLE_DIR = PROGRAM_DIR / "src/data/output_slr_table"
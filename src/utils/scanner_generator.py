@@ -0,0 +1,117 @@
+from pathlib import Path
+
+from src.model.compiled_automata import CompiledAutomata
+
+"""
+Utilitários para gerar um módulo Python autocontido que implementa o scanner de um AFD compilado.
+O módulo gerado contém a tabela de transições como constantes e laços de execução especializados,
+sem depender de PyQt5, Graphviz, PrettyTable ou do pacote src.model, podendo ser distribuído
+para outros processos e serviços.
+"""
+
+SCANNER_TEMPLATE = '''"""
+Scanner gerado automaticamente pelo Lexterminator a partir do AFD compilado.
+Módulo autocontido: não depende do Lexterminator nem de bibliotecas externas.
+
+- run(word) -> (aceito, token): reconhece uma palavra inteira.
+- scan(text, start=0, end=None): percorre o texto bruto com maior casamento, gerando (início, fim, token),
+  com token None para trechos não reconhecidos.
+"""
+
+INITIAL_STATE = 0
+
+# Mapeia cada caractere do alfabeto para sua coluna na tabela de transições
+SYMBOL_TO_COLUMN = {symbol_to_column}
+
+# TRANSITIONS[estado][coluna] = próximo estado, ou -1 se não houver transição
+TRANSITIONS = (
+{transitions}
+)
+
+# Token aceito por estado, ou None se o estado não é final
+ACCEPT_TOKENS = {accept_tokens}
+
+
+def run(word):
+    state = INITIAL_STATE
+    for char in word:
+        column = SYMBOL_TO_COLUMN.get(char)
+        if column is None:
+            return (False, "")
+        state = TRANSITIONS[state][column]
+        if state < 0:
+            return (False, "")
+    token = ACCEPT_TOKENS[state]
+    if token is None:
+        return (False, "")
+    return (True, token)
+
+
+def scan(text, start=0, end=None):
+    symbol_to_column = SYMBOL_TO_COLUMN
+    transitions = TRANSITIONS
+    accept_tokens = ACCEPT_TOKENS
+    initial_row = transitions[INITIAL_STATE]
+    end = len(text) if end is None else end
+    position = start
+
+    while position < end:
+        row = initial_row
+        last_accept_end = position
+        last_accept_token = None
+        index = position
+
+        while index < end:
+            column = symbol_to_column.get(text[index])
+            if column is None:
+                break
+            state = row[column]
+            if state < 0:
+                break
+            index += 1
+            row = transitions[state]
+            token = accept_tokens[state]
+            if token is not None:
+                last_accept_end = index
+                last_accept_token = token
+
+        if last_accept_end > position:
+            yield (position, last_accept_end, last_accept_token)
+            position = last_accept_end
+        elif text[position].isspace():
+            position += 1
+        else:
+            error_start = position
+            position += 1
+            while position < end and not text[position].isspace():
+                column = symbol_to_column.get(text[position])
+                if column is not None and initial_row[column] >= 0:
+                    break
+                position += 1
+            yield (error_start, position, None)
+'''
+
+
+def generate_scanner_source(compiled_automata: CompiledAutomata) -> str:
+    """
+    Gera o código-fonte do módulo de scanner correspondente ao AFD compilado.
+    """
+    columns_count = compiled_automata.columns_count
+    rows = []
+    for state in range(compiled_automata.states_count):
+        row = compiled_automata.transitions[state * columns_count:(state + 1) * columns_count]
+        rows.append(f"    {tuple(row)!r},")
+
+    return SCANNER_TEMPLATE.format(
+        symbol_to_column=repr(dict(sorted(compiled_automata.symbol_to_column.items()))),
+        transitions="\n".join(rows),
+        accept_tokens=repr(tuple(compiled_automata.accept_tokens)),
+    )
+
+
+def write_scanner_module(compiled_automata: CompiledAutomata, file_path: Path):
+    """
+    Gera o módulo de scanner e o salva no caminho informado.
+    """
+    with open(file_path, "w", encoding="utf-8") as file:
+        file.write(generate_scanner_source(compiled_automata))
@@ -0,0 +1,40 @@
+import pytest
+
+from src.model.lexical_analyzer import LexicalAnalyzer
+from src.utils import lexer_cache
+
+DEFINITIONS = "se: se\nid: [a-z]+\nnum: [0-9]+\n"
+
+JUNK_CONTENTS = [
+    b"",
+    b"\x80\x09",  # protocolo de pickle não suportado
+    b"\x80\x04X\x02\x00\x00\x00\xff\xfe.",  # texto UTF-8 inválido
+    b"not a pickle",
+]
+
+
+@pytest.fixture
+def cache_dir(tmp_path, monkeypatch):
+    cache_dir = tmp_path / "cache_lexer"
+    monkeypatch.setattr(lexer_cache, "LEXER_CACHE_DIR", cache_dir)
+    monkeypatch.setattr(lexer_cache, "DEFINITIONS_DIR", cache_dir / "definitions")
+    return cache_dir
+
+
+@pytest.mark.parametrize("junk", JUNK_CONTENTS)
+def test_corrupted_cache_entries_are_rebuilt(tmp_path, cache_dir, junk):
+    definitions_file = tmp_path / "definitions.txt"
+    definitions_file.write_text(DEFINITIONS, encoding="utf-8")
+
+    LexicalAnalyzer(definitions_file)
+    cache_files = list(cache_dir.rglob("*.pickle"))
+    assert cache_files
+    for cache_file in cache_files:
+        cache_file.write_bytes(junk)
+
+    lexical_analyzer = LexicalAnalyzer(definitions_file)
+    runner = lexical_analyzer.regular_definitions.runner
+    assert [runner.run(word) for word in ["se", "sex", "42", "?"]] == [
+        (True, "se"), (True, "id"), (True, "num"), (False, "")
+    ]
+    assert lexer_cache.load_compiled_lexer(lexer_cache.cache_key(definitions_file, "direct")) is not None
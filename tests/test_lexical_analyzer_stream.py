@@ -0,0 +1,37 @@
+import pytest
+
+from src.model.lexical_analyzer import LexicalAnalyzer
+
+DEFINITIONS = "sp: \\s\\s\nid: [a-z]+\nnum: [0-9]+\n"
+
+INPUTS = [
+    "ab  cd",
+    "ab   cd  ",
+    "  ab cd",
+    "x1  22 abc   d  e\n  f9\n",
+    "ab ?? cd  !",
+]
+
+
+@pytest.fixture
+def definitions_file(tmp_path):
+    path = tmp_path / "definitions.txt"
+    path.write_text(DEFINITIONS, encoding="utf-8")
+    return path
+
+
+@pytest.mark.parametrize("lazy_states_limit", [None, 64])
+@pytest.mark.parametrize("chunk_size", [1, 2, 3, 4, 5, 7, 64])
+@pytest.mark.parametrize("text", INPUTS)
+def test_streamed_maximal_munch_matches_in_memory_scan(definitions_file, tmp_path, monkeypatch, text, chunk_size, lazy_states_limit):
+    input_path = tmp_path / "input.txt"
+    input_path.write_text(text, encoding="utf-8")
+    lexical_analyzer = LexicalAnalyzer(definitions_file, lazy_states_limit, use_cache=False)
+    monkeypatch.setattr(LexicalAnalyzer, "STREAM_CHUNK_SIZE", chunk_size)
+
+    streamed = list(lexical_analyzer.stream_tokens(input_path, maximal_munch=True))
+    expected = [
+        (token if token is not None else LexicalAnalyzer.LEXICAL_ERROR_TOKEN, start, end)
+        for start, end, token in lexical_analyzer.regular_definitions.runner.scan(text)
+    ]
+    assert streamed == expected
@@ -0,0 +1,47 @@
+import importlib.util
+
+import pytest
+
+from src.model.regular_definitions import RegularDefinitions
+from src.utils.paths import PROGRAM_DIR, REGULAR_DEFINITIONS_INPUT_DIR
+from src.utils.scanner_generator import write_scanner_module
+
+INPUT_COMPILE_FILES = sorted((PROGRAM_DIR / "src/data/input_compile").glob("*.txt"))
+
+
+def load_scanner_module(file_path):
+    spec = importlib.util.spec_from_file_location(file_path.stem, file_path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+@pytest.mark.parametrize(
+    "definitions_file",
+    sorted(REGULAR_DEFINITIONS_INPUT_DIR.glob("*.txt")),
+    ids=lambda path: path.name
+)
+def test_generated_scanner_matches_automata(definitions_file, tmp_path):
+    regular_definitions = RegularDefinitions(definitions_file, use_cache=False)
+    automata = regular_definitions.automata
+    compiled_automata = regular_definitions.compiled_automata
+    scanner_path = tmp_path / "generated_scanner.py"
+    write_scanner_module(compiled_automata, scanner_path)
+    scanner = load_scanner_module(scanner_path)
+
+    assert INPUT_COMPILE_FILES
+    mismatches = []
+    for input_file in INPUT_COMPILE_FILES:
+        source = input_file.read_text(encoding="utf-8")
+        for word in source.split():
+            expected = automata.run(word)
+            result = scanner.run(word)
+            if result != expected:
+                mismatches.append((input_file.name, word, expected, result))
+
+        expected_tokens = list(compiled_automata.scan(source))
+        scanned_tokens = list(scanner.scan(source))
+        if scanned_tokens != expected_tokens:
+            mismatches.append((input_file.name, expected_tokens, scanned_tokens))
+
+    assert mismatches == []